@@ -138,9 +138,9 @@ if __name__ == "__main__":
     run_simulation()
     import sys"""
 import os
-import random
 import uuid
-import pygame
+import argparse
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
@@ -150,131 +150,194 @@ os.sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import settings, constants
 from modules.agent import Agent
+from modules.agent_pool import AgentPool
 from modules.environment import Environment
 from modules.genetics import reproduce
 from modules.decision_engine import DecisionEngine
-from modules.evolution import reproduce, genetic_distance
-from modules.visualization import Visualization
-from modules.utils import setup_directories, log_agent_data, log_species_data, save_logs
+from modules.evolution import reproduce, reproduce_batch, genetic_distance
+from modules.utils import (setup_directories, LogWriter, SIMULATION_LOG_SCHEMA, SPECIES_LOG_SCHEMA,
+                           AGGREGATE_LOG_SCHEMA, STEP_SUMMARY_SCHEMA, LOG_LEVELS, log_population_data,
+                           log_species_aggregates, log_step_summary, sample_rows, save_logs)
 from modules.navigation import Pathfinder
+from modules import rng
 
 
-def run_simulation():
+def run_simulation(headless=None, render_every=None):
     """
     Main function to run the entire simulation, now using the advanced NOPAİNNOGAİN modules.
+
+    Args:
+        headless (bool): Run without pygame, a window or FPS throttling.
+            Defaults to settings.HEADLESS.
+        render_every (int): Draw (and throttle) only every N steps. Defaults to settings.RENDER_EVERY.
     """
+    headless = settings.HEADLESS if headless is None else headless
+    render_every = max(1, settings.RENDER_EVERY if render_every is None else render_every)
     print("Starting the NOPAİNNOGAİN AI Ecosystem Simulator...")
 
     # 1. Setup
+    # Every random draw of the run comes from streams seeded here
+    seed = rng.seed_run(settings.SEED)
+    print(f"Random seed: {seed} (set settings.SEED to replay this run)")
     setup_directories()
     env = Environment(settings.GRID_WIDTH, settings.GRID_HEIGHT)
     rl_engine = DecisionEngine()
+    if settings.LOAD_Q_TABLE:
+        rl_engine.load_q_table(read_only=settings.Q_TABLE_READ_ONLY)
     pathfinder = Pathfinder(env)
 
-    # Initialize Pygame and the visualization module
+    # Initialize Pygame and the visualization module, unless running headless
     # The Visualization class now handles Pygame initialization internally
-    vis = Visualization(env)
-    clock = pygame.time.Clock()
+    vis = None
+    if not headless:
+        import pygame
+        from modules.visualization import Visualization
+        vis = Visualization(env)
+        clock = pygame.time.Clock()
 
     # Initialize the first generation of agents
-    agents = [
+    # All agents live in one columnar pool; Agent objects are views onto its rows.
+    pool = AgentPool(capacity=settings.INITIAL_PREY_POPULATION, environment=env)
+    placement = rng.stream("agents")
+    for i in range(settings.INITIAL_PREY_POPULATION):
         Agent(
             name=f"Agent_{i}",
             species_id=f"prey_{i}",
-            position=(random.randint(0, settings.GRID_WIDTH - 1), random.randint(0, settings.GRID_HEIGHT - 1))
-        ) for i in range(settings.INITIAL_PREY_POPULATION)
-    ]
+            position=(int(placement.integers(settings.GRID_WIDTH)), int(placement.integers(settings.GRID_HEIGHT))),
+            pool=pool
+        )
 
-    # Initialize log files
-    simulation_log_df = pd.DataFrame(columns=['step', 'agent_id', 'agent_name', 'species_id', 'health', 'energy', 'position_x', 'position_y', 'generation', 'age', 'speed', 'intelligence', 'aggression', 'cooperation', 'pollution_tolerance', 'action', 'reward'])
-    species_log_df = pd.DataFrame(columns=['step', 'species_id', 'population_size'])
+    # Initialize log files; rows are streamed to disk in chunks as the run goes.
+    # All of them go to the data directory, where the analysis dashboards read them.
+    if settings.LOG_LEVEL not in LOG_LEVELS:
+        raise ValueError(f"Unknown LOG_LEVEL '{settings.LOG_LEVEL}'. Expected one of {LOG_LEVELS}.")
+    if settings.LOG_LEVEL == "aggregate":
+        simulation_log = LogWriter(constants.AGGREGATE_LOG, AGGREGATE_LOG_SCHEMA)
+    else:
+        simulation_log = LogWriter(constants.SIMULATION_LOG, SIMULATION_LOG_SCHEMA)
+    species_log = LogWriter(constants.SPECIES_LOG, SPECIES_LOG_SCHEMA)
+    summary_log = LogWriter(constants.STEP_SUMMARY_LOG, STEP_SUMMARY_SCHEMA)
+    action_names = np.array(rl_engine.actions, dtype=object)
 
     # 2. Main Simulation Loop
     running = True
     step = 0
-    while running and step < settings.MAX_STEPS:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-
-        # Create a new list for the next generation of agents
-        new_agents = []
-
-        # Process each agent
-        for agent in agents:
-            if not agent.alive:
-                continue
-
-            # Get the current state
-            current_state = rl_engine.get_state(agent, env)
-
-            # Get the action from the decision engine
-            # FIX: The DecisionEngine's method is `choose_action`, not `get_action`.
-            # It also requires the list of possible actions.
-            action = rl_engine.choose_action(agent, env, constants.ACTIONS)
-
-            # Execute the action and get the reward
-            agent.perform_action(action, env)
-            reward = rl_engine.get_reward(agent, env, action)
-
-            # Update Q-table
-            next_state = rl_engine.get_state(agent, env)
-            rl_engine.update_q_table(current_state, action, reward, next_state)
-
-            # Log agent data
-            simulation_log_df = log_agent_data(simulation_log_df, agent, step, action, reward)
-
-            # Handle reproduction and check status
-            if agent.energy > settings.REPRODUCTION_ENERGY_THRESHOLD:
-                if random.random() < agent.traits['reproduction_rate']:
-                    child = reproduce(agent, random.choice(agents))
-                    new_agents.append(child)
-            agent.check_status()
-            agent.age += 1
-
-        # Remove dead agents and add new ones
-        agents = [agent for agent in agents if agent.alive]
-        agents.extend(new_agents)
-
-        # Log species populations
-        species_populations = {}
-        for agent in agents:
-            species_populations[agent.species_id] = species_populations.get(agent.species_id, 0) + 1
-        for species_id, size in species_populations.items():
-            species_log_df = log_species_data(species_log_df, species_id, step, size)
-
-        # Update environment
-        env.update_state()
+    try:
+        while running and step < settings.MAX_STEPS:
+            if vis is not None:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        running = False
+                    vis.handle_event(event)
+
+            # Rows of the agents that act this step; children born this step join next step
+            live = pool.live_indices()
+
+            # Get the current states and the actions from the decision engine in one batch
+            current_states = rl_engine.encode_states(pool, env, live)
+            actions = rl_engine.choose_actions(pool, env, current_states)
+
+            # Execute every agent's action as one batch; the reward and the next state
+            # share a single lookup of each agent's new cell
+            pool.step(live, actions, env)
+            next_cells = rl_engine.observe_cells(pool, env, live)
+            rewards = rl_engine.get_rewards(pool, env, live, actions, next_cells)
+            next_states = rl_engine.encode_states(pool, env, live, next_cells)
+
+            # Update Q-table with the whole step's transitions
+            rl_engine.update_q_table_batch(current_states, actions, rewards, next_states)
+
+            # Log agent data for the whole step at once, at the configured granularity
+            if settings.LOG_LEVEL == "aggregate":
+                log_species_aggregates(simulation_log, pool, live, step, actions)
+            elif settings.LOG_LEVEL == "sampled":
+                logged = sample_rows(live, step)
+                log_population_data(simulation_log, pool, live[logged], step, action_names[actions[logged]],
+                                    rewards[logged])
+            else:
+                log_population_data(simulation_log, pool, live, step, action_names[actions], rewards)
+
+            # Handle reproduction: every birth of the step is made in one batch
+            mating = rng.stream("evolution")
+            parents = live[(pool.energy[live] > settings.REPRODUCTION_ENERGY_THRESHOLD)
+                           & (mating.random(len(live)) < pool.trait('reproduction_rate', live))]
+            if settings.MATE_WITHIN_SPECIES:
+                partners = pool.random_partners(parents, settings.MATE_SEARCH_RADIUS)
+                parents, partners = parents[partners >= 0], partners[partners >= 0]
+            else:
+                partners = live[mating.integers(0, len(live), size=len(parents))]
+            births = len(reproduce_batch(pool, parents, partners))
+
+            # Death checks and aging for the whole population
+            pool.check_status(live)
+            pool.age_up(live)
+
+            # Remove dead agents; newborns are already in the pool
+            dead = pool.remove_dead()
+            population = len(pool)
+
+            # Log the step summary read by the analysis dashboards
+            log_step_summary(summary_log, pool, live, step, actions,
+                             births=births, deaths=len(dead))
+
+            # Log species populations
+            codes, sizes = np.unique(pool.species[pool.live_indices()], return_counts=True)
+            species_log.append_columns({
+                'step': step,
+                'species_id': pool.species_ids[codes],
+                'population_size': sizes,
+            })
 
-        # --- The Key Fix: Render and update the display ---
-        vis.render(agents)
+            # Update environment
+            env.update_state()
 
-        # Decay exploration rate
-        rl_engine.exploration_rate = max(settings.MIN_EXPLORATION_RATE, rl_engine.exploration_rate * settings.EXPLORATION_DECAY)
+            # --- The Key Fix: Render and update the display ---
+            if vis is not None and step % render_every == 0:
+                vis.render(None, pool)
 
-        # Check for victory or extinction
-        if len(agents) >= settings.VICTORY_POPULATION:
-            print("VICTORY! The population has reached the target goal.")
-            running = False
+            # Decay exploration rate
+            rl_engine.exploration_rate = max(settings.MIN_EXPLORATION_RATE, rl_engine.exploration_rate * settings.EXPLORATION_DECAY)
 
-        print(f"Step: {step}, Population: {len(agents)}, Exploration Rate: {rl_engine.exploration_rate:.2f}")
-        if not agents:
-            print("All agents have perished.")
-            running = False
+            # Check for victory or extinction
+            if population >= settings.VICTORY_POPULATION:
+                print("VICTORY! The population has reached the target goal.")
+                running = False
 
-        # Control the simulation speed
-        clock.tick(settings.FPS)
+            print(f"Step: {step}, Population: {population}, Exploration Rate: {rl_engine.exploration_rate:.2f}")
+            if not population:
+                print("All agents have perished.")
+                running = False
 
-        step += 1
+            # Control the simulation speed
+            if vis is not None and step % render_every == 0:
+                clock.tick(settings.FPS)
 
-    # 3. Cleanup and Analysis
-    save_logs(simulation_log_df, f"{constants.LOG_DIR}simulation_logs.csv")
-    save_logs(species_log_df, f"{constants.LOG_DIR}species_logs.csv")
-    vis.quit()
-    print("Simulation finished. Logs saved to the data/logs directory.")
+            step += 1
+    finally:
+        # 3. Cleanup and Analysis
+        # Flush the logs (and stop their writer threads) even if the run was interrupted,
+        # closing every log even when closing an earlier one fails
+        try:
+            save_logs(simulation_log, simulation_log.filepath)
+        finally:
+            try:
+                save_logs(species_log, species_log.filepath)
+            finally:
+                save_logs(summary_log, summary_log.filepath)
+    if settings.SAVE_Q_TABLE and rl_engine.training:
+        rl_engine.save_q_table()
+    if vis is not None:
+        vis.quit()
+    print(f"Simulation finished. Logs saved to {constants.DATA_DIR}.")
 
 if __name__ == "__main__":
-    run_simulation()
+    parser = argparse.ArgumentParser(description="NOPAİNNOGAİN AI Ecosystem Simulator")
+    parser.add_argument("--headless", action="store_true", default=None,
+                        help="run without pygame, a window or FPS throttling")
+    parser.add_argument("--render-every", type=int, default=None, metavar="N",
+                        help="draw only every N steps")
+    args = parser.parse_args()
+    run_simulation(headless=args.headless, render_every=args.render_every)
 
 """
 # main.py
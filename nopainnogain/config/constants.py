@@ -9,10 +9,13 @@ REPORTS_DIR = os.path.join(DATA_DIR, "reports")
 # Log files
 SIMULATION_LOG = os.path.join(DATA_DIR, "simulation_logs.csv")
 SPECIES_LOG = os.path.join(DATA_DIR, "species_logs.csv")
+AGGREGATE_LOG = os.path.join(DATA_DIR, "species_aggregate_logs.csv")  # Simulation log when LOG_LEVEL is "aggregate"
 REWARDS_LOG = os.path.join(DATA_DIR, "rewards_logs.csv")
+STEP_SUMMARY_LOG = os.path.join(DATA_DIR, "step_summary.csv")
 
 # Q-table
 Q_TABLE_PATH = os.path.join(DATA_DIR, "q_table.npy")
+Q_TABLE_JSON_PATH = os.path.join(DATA_DIR, "q_table.json")  # Legacy format, imported once
 # constants.py
 
 # --- Core Simulation Parameters ---
@@ -2,6 +2,7 @@
 GRID_WIDTH = 50
 GRID_HEIGHT = 100
 MAX_STEPS = 1000
+SEED = None # Run-level random seed; None picks a fresh one (printed at start so the run can be replayed)
 
 # Agent starting populations
 INITIAL_PREY_POPULATION = 100
@@ -14,6 +15,21 @@ DISCOUNT_FACTOR = 0.95
 MAX_EXPLORATION_RATE = 1.0
 MIN_EXPLORATION_RATE = 0.01
 EXPLORATION_DECAY = 0.995
+# How batched Q-updates combine several agents hitting the same state-action pair
+# in one step: "mean" averages their TD errors, "sum" accumulates them
+Q_BATCH_REDUCTION = "mean"
+# State discretization: bin width of each continuous input in the RL state
+STATE_HEALTH_BIN = 25
+STATE_ENERGY_BIN = 25
+STATE_RESOURCE_BIN = 25
+STATE_HAZARD_RESOLUTION = 1.0
+# Optional cap on the number of states kept in the Q-table; the least recently
+# used states are evicted once it is reached. None keeps every state.
+Q_TABLE_MAX_STATES = None
+# Q-table persistence (see constants.Q_TABLE_PATH)
+LOAD_Q_TABLE = False # Warm start from the saved table
+Q_TABLE_READ_ONLY = False # Memory-map the saved table read-only and skip learning (inference runs)
+SAVE_Q_TABLE = True
 
 # Resource Attributes
 MAX_RESOURCE_CAPACITY = 1000
@@ -31,6 +47,8 @@ GENOME_LENGTH = 10
 MAX_AGE = 100
 REPRODUCTION_ENERGY_THRESHOLD = 75
 GENETIC_DISTANCE_THRESHOLD = 3.0
+MATE_WITHIN_SPECIES = False # Only pair agents with a partner of their own species
+MATE_SEARCH_RADIUS = None # With MATE_WITHIN_SPECIES, prefer partners within this many cells (None = anywhere)
 MUTATION_PROBABILITY = 0.1  
 MUTATION_RATE = 0.05
 MUTATION_STRENGTH = 1.0
@@ -53,7 +71,26 @@ MIN_ENERGY = 0
 SCREEN_WIDTH = 1000
 SCREEN_HEIGHT = 800
 TILE_SIZE = 20
+TERRAIN_FULL_REDRAW_FRACTION = 0.1 # Redraw the whole terrain as one image when more than this share of cells changed
+AGENT_ENERGY_BUCKETS = 1 # Shade agents darker by energy in this many steps (1 = no shading)
+CAMERA_PAN_SPEED = 20 # Screen pixels per arrow/WASD key press
+CAMERA_ZOOM_STEP = 2 # Zoom factor per mouse wheel notch or +/- key press
+CAMERA_MAX_ZOOM = 4
 FPS = 60 # Slower for better visibility
+HEADLESS = False # Run without pygame, a window or FPS throttling (also: main.py --headless)
+RENDER_EVERY = 1 # Draw and throttle only every N steps when a window is open
+
+# Logging
+LOG_LEVEL = "full" # "full" (every agent, every step), "sampled" or "aggregate" (per-species summaries only)
+LOG_SAMPLE_EVERY = 10 # "sampled": log agents only every N steps
+LOG_SAMPLE_FRACTION = 1.0 # "sampled": fraction of agents logged on those steps
+LOG_CHUNK_SIZE = 50000 # Rows buffered per log file before a chunk is written to disk
+LOG_FORMAT = "csv" # "csv", or "parquet" for compressed columnar logs (requires pyarrow)
+LOG_PARTITION_STEPS = 1000 # Steps per Parquet partition directory
+LOG_BACKGROUND_WRITER = True # Write log chunks on a background thread
+LOG_QUEUE_SIZE = 4 # Chunks waiting for the writer thread before the queue policy applies
+LOG_QUEUE_POLICY = "block" # "block" the simulation, or "aggregate" (keep only per-step summaries of overflow)
+ANALYSIS_CHUNK_SIZE = 500000 # Rows per chunk when the analysis streams a log
 
 # Color Palette
 COLORS = {
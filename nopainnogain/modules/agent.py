@@ -321,64 +321,177 @@ class Agent:
         self.alive = True
         self.age = 0
 """
-import random
-import uuid
+import hashlib
 from config import constants, settings
+from modules import rng
+from modules.agent_pool import AgentPool, TRAIT_GENES
+
+
+def species_color(species_id):
+    """
+    A simple way to generate a unique color based on species_id.
+    This ensures all agents in the same species have the same color.
+    """
+    # Hashing the id is cheap enough for every new species, so colors need no cache
+    r, g, b = hashlib.blake2b(str(species_id).encode(), digest_size=3).digest()
+    return (50 + r * 206 // 256, 50 + g * 206 // 256, 50 + b * 206 // 256)
+
 
 class Agent:
     """
     Represents an autonomous agent with a genome, phenotype, and social state.
+    The agent's data lives in one row of an AgentPool; this class is a view onto it.
     """
-    def _get_color_from_species_id(self):
-        # A simple way to generate a unique color based on species_id
-        # This ensures all agents in the same species have the same color
-        random.seed(str(self.species_id))
-        r = random.randint(50, 255)
-        g = random.randint(50, 255)
-        b = random.randint(50, 255)
-        random.seed(None) # Reset the seed so other random operations aren't affected
-        return (r, g, b)
+    __slots__ = ('_pool', '_index', 'group_id', 'state', '__weakref__')
 
-    def __init__(self, name, health=constants.MAX_HEALTH, energy=constants.MAX_ENERGY, genome=None, species_id=None, position=None, generation=0):
-        self.name = name
-        self.id = uuid.uuid4()
-        self.health = health
-        self.energy = energy
-        self.position = position if position else (0, 0)
-        self.generation = generation
-        self.alive = True
-        self.age = 0
-        self.species_id = species_id if species_id else self.id
+    def _get_color_from_species_id(self):
+        return species_color(self.species_id)
+
+    def __init__(self, name, health=constants.MAX_HEALTH, energy=constants.MAX_ENERGY, genome=None, species_id=None, position=None, generation=0, pool=None):
+        # Agents are views onto one row of an AgentPool; standalone agents share AgentPool.shared()
+        pool = pool if pool is not None else AgentPool.shared()
+        agent_id = AgentPool.new_id()
+        if genome is None or not len(genome):
+            genome = rng.stream("agents").uniform(1.0, 10.0, pool.genome_length)
+        elif len(genome) < pool.genome_length:
+            # Handle cases where genome is too short, perhaps from initial creation
+            # or legacy data. A simple solution is to extend it with random values.
+            genome = list(genome) + rng.stream("agents").uniform(1.0, 10.0, pool.genome_length - len(genome)).tolist()
+        row = pool.add(
+            name, agent_id, health, energy, genome,
+            species_id if species_id else agent_id,
+            position if position else (0, 0),
+            generation,
+        )
+        self._bind(pool, row)
         self.group_id = None
         self.state = "FORAGING"
-        self.genome = genome if genome else [random.uniform(1.0, 10.0) for _ in range(settings.GENOME_LENGTH)]
-        self.traits = self._express_phenotype()
-        self.color = self._get_color_from_species_id()
+
+    @classmethod
+    def view(cls, pool, row):
+        """Returns an Agent bound to an existing pool row without adding a new agent."""
+        agent = cls.__new__(cls)
+        agent._bind(pool, row)
+        agent.group_id = None
+        agent.state = "FORAGING" if pool.alive[row] else "DEAD"
+        return agent
+
+    def _bind(self, pool, row):
+        self._pool = pool
+        self._index = int(row)
+        pool._views[self._index] = self
+
+    def __del__(self):
+        # A standalone agent's row is freed together with the agent
+        pool = getattr(self, '_pool', None)
+        if pool is not None and pool.release_unheld:
+            pool._views.pop(self._index, None)
+            pool.release([self._index])
+
+    # -------------------- pool-backed attributes --------------------
+
+    @property
+    def id(self):
+        return int(self._pool.ids[self._index])
+
+    @property
+    def name(self):
+        return self._pool.names[self._index]
+
+    @name.setter
+    def name(self, value):
+        self._pool.names[self._index] = value
+
+    @property
+    def health(self):
+        return float(self._pool.health[self._index])
+
+    @health.setter
+    def health(self, value):
+        self._pool.health[self._index] = value
+
+    @property
+    def energy(self):
+        return float(self._pool.energy[self._index])
+
+    @energy.setter
+    def energy(self, value):
+        self._pool.energy[self._index] = value
+
+    @property
+    def age(self):
+        return int(self._pool.age[self._index])
+
+    @age.setter
+    def age(self, value):
+        self._pool.age[self._index] = value
+
+    @property
+    def generation(self):
+        return int(self._pool.generation[self._index])
+
+    @generation.setter
+    def generation(self, value):
+        self._pool.generation[self._index] = value
+
+    @property
+    def alive(self):
+        return bool(self._pool.alive[self._index])
+
+    @alive.setter
+    def alive(self, value):
+        self._pool.set_alive([self._index], bool(value))
+
+    @property
+    def position(self):
+        x, y = self._pool.position[self._index]
+        return (int(x), int(y))
+
+    @position.setter
+    def position(self, value):
+        self._pool.move([self._index], value)
+
+    @property
+    def species_id(self):
+        return self._pool.species_ids[self._pool.species[self._index]]
+
+    @species_id.setter
+    def species_id(self, value):
+        self._pool.set_species([self._index], value)
+
+    @property
+    def genome(self):
+        return self._pool.genome[self._index].tolist()
+
+    @genome.setter
+    def genome(self, value):
+        self._pool.genome[self._index] = value
+
+    @property
+    def color(self):
+        return self._get_color_from_species_id()
+
+    @property
+    def traits(self):
+        return self._express_phenotype()
+
+    def find_mate(self, radius=None):
+        """A random living agent of the same species (preferably within `radius` cells), or None."""
+        row = self._pool.random_partner(self._index, radius)
+        return None if row is None else self._pool.view(row)
 
     def _express_phenotype(self):
         """
         Maps the agent's genetic code (genome) to a set of expressible traits (phenotype).
         This is a simple linear mapping for demonstration.
         """
-        # Ensure the genome is long enough to express all traits
-        if len(self.genome) < 6:
-            # Handle cases where genome is too short, perhaps from initial creation
-            # or legacy data. A simple solution is to extend it with random values.
-            self.genome.extend([random.uniform(1.0, 10.0) for _ in range(6 - len(self.genome))])
-
-        return {
-            'speed': self.genome[0],
-            'intelligence': self.genome[1],
-            'aggression': self.genome[2],
-            'cooperation': self.genome[3],
-            'pollution_tolerance': self.genome[4],
-            'reproduction_rate': self.genome[5],  # Mapped to a specific gene
-        }
+        genome = self._pool.genome[self._index]
+        return {trait: float(genome[gene]) for trait, gene in TRAIT_GENES.items()}
     
     def perform_action(self, action, environment):
         """Performs an action, modifying the agent's state."""
         if action == "move":
-            self._move(random.choice(["move_up", "move_down", "move_left", "move_right"]), environment)
+            self._move(("move_up", "move_down", "move_left", "move_right")[rng.stream("agents").integers(4)], environment)
         elif action == "eat":
             self._eat(environment)
         # Other actions would be implemented here
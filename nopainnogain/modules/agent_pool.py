@@ -0,0 +1,392 @@
+import itertools
+import weakref
+import numpy as np
+from config import constants, settings
+from modules import rng
+
+# Genome position of each expressed trait (see Agent._express_phenotype)
+TRAIT_GENES = {
+    'speed': 0,
+    'intelligence': 1,
+    'aggression': 2,
+    'cooperation': 3,
+    'pollution_tolerance': 4,
+    'reproduction_rate': 5,
+}
+
+# (dx, dy) for "move_up", "move_down", "move_left", "move_right"
+MOVE_DIRECTIONS = np.array([[0, -1], [0, 1], [-1, 0], [1, 0]])
+
+# Agent IDs are monotonic integers, unique across pools
+_agent_ids = itertools.count(1)
+
+# Pool holding the agents created without one (see AgentPool.shared)
+_shared_pool = None
+
+
+class AgentPool:
+    """
+    Columnar storage for a whole population of agents.
+
+    Every per-agent quantity lives in one contiguous NumPy array indexed by row,
+    so the population can be advanced with a handful of array operations per step.
+    Rows are stable for the lifetime of an agent: dead rows are released and then
+    recycled for newborns instead of compacting the arrays.
+
+    A pool attached to an Environment lets the environment index its live agents
+    by cell (see Environment.agents_at).
+    """
+    def __init__(self, capacity=1024, genome_length=settings.GENOME_LENGTH, environment=None):
+        self.capacity = max(1, capacity)
+        self.genome_length = genome_length
+        self.size = 0  # High-water mark of rows ever handed out
+
+        self.energy = np.zeros(self.capacity)
+        self.health = np.zeros(self.capacity)
+        self.age = np.zeros(self.capacity, dtype=np.int64)
+        self.generation = np.zeros(self.capacity, dtype=np.int64)
+        self.position = np.zeros((self.capacity, 2), dtype=np.int64)
+        self.alive = np.zeros(self.capacity, dtype=bool)
+        self.active = np.zeros(self.capacity, dtype=bool)  # Row currently holds an agent
+        self.species = np.zeros(self.capacity, dtype=np.int32)
+        self.genome = np.zeros((self.capacity, genome_length))
+        self.ids = np.zeros(self.capacity, dtype=np.int64)
+        self.names = np.empty(self.capacity, dtype=object)
+
+        # Species table: the id of each species code in use. Extinct species are
+        # dropped when it fills up, which renumbers the codes (see _reserve_species)
+        self.species_ids = np.empty(4, dtype=object)
+        self.species_count = 0
+        self.codes_version = 0  # Bumped when the codes are renumbered; until then new species only append
+        self._species_codes = {}  # species id -> code, filled in on lookup (see species_code)
+        self._free_rows = []
+        self._views = weakref.WeakValueDictionary()  # Views are only kept while someone holds them
+        self.release_unheld = False  # Free a row as soon as its view is garbage collected
+        # Bumped whenever agents are born, die or move (layout) and whenever they are
+        # born, die or change species (species), so indexes built from those columns
+        # can tell when they are stale
+        self.layout_version = 0
+        self.species_version = 0
+        self._species_index = None
+        self.environment = None
+        if environment is not None:
+            self.attach(environment)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.active[:self.size] & self.alive[:self.size]))
+
+    # -------------------- storage --------------------
+
+    def _grow(self, min_capacity):
+        new_capacity = self.capacity
+        while new_capacity < min_capacity:
+            new_capacity *= 2
+        for column in ('energy', 'health', 'age', 'generation', 'position', 'alive',
+                       'active', 'species', 'genome', 'ids', 'names'):
+            old = getattr(self, column)
+            new = np.zeros((new_capacity,) + old.shape[1:], dtype=old.dtype)
+            if old.dtype == object:
+                new[:] = None
+            new[:self.size] = old[:self.size]
+            setattr(self, column, new)
+        self.capacity = new_capacity
+
+    def _allocate(self, count):
+        """Returns `count` free rows, reusing released rows before growing."""
+        reused = [self._free_rows.pop() for _ in range(min(count, len(self._free_rows)))]
+        fresh = count - len(reused)
+        if self.size + fresh > self.capacity:
+            self._grow(self.size + fresh)
+        rows = np.concatenate([np.array(reused, dtype=np.int64),
+                               np.arange(self.size, self.size + fresh, dtype=np.int64)])
+        self.size += fresh
+        return rows
+
+    @staticmethod
+    def new_id():
+        """Returns a fresh agent ID."""
+        return next(_agent_ids)
+
+    @staticmethod
+    def new_ids(count):
+        """Returns `count` fresh agent IDs."""
+        return np.fromiter(itertools.islice(_agent_ids, count), dtype=np.int64, count=count)
+
+    @staticmethod
+    def shared():
+        """
+        The pool of standalone agents (created without a pool). It is shared instead
+        of one pool per agent, and frees a row once nothing holds its Agent.
+        """
+        global _shared_pool
+        if _shared_pool is None:
+            _shared_pool = AgentPool()
+            _shared_pool.release_unheld = True
+        return _shared_pool
+
+    def species_code(self, species_id):
+        """Returns the integer code for a species id, registering it if new."""
+        codes = self._species_codes
+        if len(codes) < self.species_count:
+            # Species registered in blocks by new_species get their lookup entry here, on demand
+            known = len(codes)
+            codes.update(zip(self.species_ids[known:self.species_count].tolist(), range(known, self.species_count)))
+        code = codes.get(species_id)
+        if code is None:
+            code = int(self.new_species([species_id])[0])
+        return code
+
+    def new_species(self, species_ids):
+        """
+        Registers a block of species ids not yet in the pool and returns their codes.
+        Registering may renumber the codes of existing species (see _reserve_species),
+        so read the codes of existing rows only afterwards.
+        """
+        count = len(species_ids)
+        if self.species_count + count > len(self.species_ids):
+            self._reserve_species(count)
+        codes = np.arange(self.species_count, self.species_count + count)
+        self.species_ids[codes] = species_ids
+        self.species_count += count
+        return codes
+
+    def _reserve_species(self, count):
+        """
+        Makes room for `count` more species codes. Extinct species are dropped first,
+        renumbering the species of the held rows; the table doubles when it would still
+        be over half full, so each species costs amortized O(1).
+        """
+        # Only rows that hold an agent keep their species
+        held = np.flatnonzero(self.active[:self.size])
+        in_use = np.zeros(self.species_count, dtype=bool)
+        in_use[self.species[held]] = True
+        self.species[held] = (np.cumsum(in_use) - 1)[self.species[held]]
+        kept = self.species_ids[:self.species_count][in_use]
+        self.species_count = len(kept)
+        self._species_codes = {}
+        self.species_version += 1
+        self.codes_version += 1
+
+        capacity = len(self.species_ids)
+        while capacity < 2 * (self.species_count + count):
+            capacity *= 2
+        self.species_ids = np.empty(capacity, dtype=object)
+        self.species_ids[:self.species_count] = kept
+
+    def add(self, name, agent_id, health, energy, genome, species_id, position, generation=0):
+        """Stores a single agent and returns its row."""
+        if self._free_rows:
+            row = self._free_rows.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow(self.size + 1)
+            row = self.size
+            self.size += 1
+        self.names[row] = name
+        self.ids[row] = agent_id
+        self.health[row] = health
+        self.energy[row] = energy
+        self.genome[row] = genome
+        self.species[row] = self.species_code(species_id)
+        self.position[row] = position
+        self.generation[row] = generation
+        self.age[row] = 0
+        self.alive[row] = True
+        self.active[row] = True
+        self.layout_version += 1
+        self.species_version += 1
+        return row
+
+    def add_batch(self, names, agent_ids, health, energy, genomes, species_codes, positions, generation=0):
+        """
+        Stores a block of agents and returns their rows. Every argument holds one
+        value per agent (scalars are broadcast); species are given as codes
+        (see species_code).
+        """
+        rows = self._allocate(len(genomes))
+        self.names[rows] = names
+        self.ids[rows] = agent_ids
+        self.health[rows] = health
+        self.energy[rows] = energy
+        self.genome[rows] = genomes
+        self.species[rows] = species_codes
+        self.position[rows] = positions
+        self.generation[rows] = generation
+        self.age[rows] = 0
+        self.alive[rows] = True
+        self.active[rows] = True
+        self.layout_version += 1
+        self.species_version += 1
+        return rows
+
+    def adopt(self, agent):
+        """Moves an agent (usually a standalone one) into this pool and rebinds its view."""
+        if agent._pool is self:
+            return agent._index
+        source, src = agent._pool, agent._index
+        row = self.add(source.names[src], source.ids[src], source.health[src], source.energy[src],
+                       source.genome[src], source.species_ids[source.species[src]],
+                       source.position[src], source.generation[src])
+        self.age[row] = source.age[src]
+        self.set_alive([row], source.alive[src])
+        source._views.pop(int(src), None)
+        if source.release_unheld:
+            source.release([src])
+        agent._bind(self, row)
+        return row
+
+    def release(self, rows):
+        """Frees rows for reuse. Views still pointing at them get a private copy."""
+        rows = np.asarray(rows, dtype=np.int64)
+        for row in rows.tolist():
+            agent = self._views.get(row)
+            if agent is not None:
+                private = AgentPool(capacity=1, genome_length=self.genome_length)
+                private.adopt(agent)
+        self._free_rows.extend(rows.tolist())
+        self.set_alive(rows[self.active[rows]], False)
+        self.active[rows] = False
+
+    def remove_dead(self):
+        """Releases every row whose agent died and returns those rows."""
+        dead = np.flatnonzero(self.active[:self.size] & ~self.alive[:self.size])
+        self.release(dead)
+        return dead
+
+    # -------------------- views --------------------
+
+    def live_indices(self):
+        return np.flatnonzero(self.active[:self.size] & self.alive[:self.size])
+
+    def view(self, row):
+        """Returns the Agent view for a row, creating it on first access."""
+        row = int(row)
+        agent = self._views.get(row)
+        if agent is None:
+            from modules.agent import Agent
+            agent = Agent.view(self, row)
+        return agent
+
+    def trait(self, trait, rows=slice(None)):
+        return self.genome[rows, TRAIT_GENES[trait]]
+
+    # -------------------- spatial lookup --------------------
+
+    def attach(self, environment):
+        """Makes `environment` index this pool's live agents by cell from now on."""
+        self.environment = environment
+        environment.agent_pool = self
+
+    def move(self, rows, positions):
+        """Writes new (x, y) positions for rows."""
+        self.position[rows] = np.asarray(positions, dtype=np.int64).reshape(-1, 2)
+        self.layout_version += 1
+
+    def set_alive(self, rows, alive):
+        """Marks rows alive or dead."""
+        self.alive[rows] = alive
+        self.layout_version += 1
+        self.species_version += 1
+
+    def rows_in_rect(self, x0, y0, x1, y1):
+        """
+        Live rows with x0 <= x < x1 and y0 <= y < y1. With an attached environment
+        this goes through its occupancy index, so the cost follows the rectangle's
+        rows and the agents inside it rather than the population size.
+        """
+        if self.environment is not None:
+            return self.environment.agents_in_rect(x0, y0, x1, y1)
+        live = self.live_indices()
+        x, y = self.position[live, 0], self.position[live, 1]
+        return live[(x >= x0) & (x < x1) & (y >= y0) & (y < y1)]
+
+    # -------------------- species membership --------------------
+
+    def set_species(self, rows, species_id):
+        """Moves rows to another species."""
+        code = self.species_code(species_id)
+        self.species[rows] = code
+        self.species_version += 1
+
+    def _species_members(self):
+        """
+        (codes, rows, slots): the live rows grouped by species code, their codes, and
+        each row's position in that order (-1 for rows that are not live). Rebuilt with
+        one argsort the first time it is needed after births, deaths or species changes.
+        """
+        if self._species_index is None or self._species_index[0] != self.species_version:
+            live = self.live_indices()
+            rows = live[np.argsort(self.species[live], kind='stable')]
+            slots = np.full(self.size, -1, dtype=np.int64)
+            slots[rows] = np.arange(len(rows))
+            self._species_index = (self.species_version, self.species[rows], rows, slots)
+        return self._species_index[1:]
+
+    def random_partner(self, row, radius=None):
+        """
+        Row of a random live agent of the same species as `row`, other than `row`
+        itself, or None if there is none. With a radius (and an attached
+        environment), partners within that many cells are preferred.
+        """
+        partner = self.random_partners([row], radius)[0]
+        return None if partner < 0 else int(partner)
+
+    def random_partners(self, rows, radius=None):
+        """random_partner for each of `rows`, with -1 where a row has no partner."""
+        rows = np.asarray(rows, dtype=np.int64)
+        member_codes, members, slots = self._species_members()
+        codes = self.species[rows]
+        first = np.searchsorted(member_codes, codes)
+        own = slots[rows]
+        # Draw from the species' other members; a draw at or past the row's own slot stands for the next one
+        others = np.searchsorted(member_codes, codes, side='right') - first - (own >= 0)
+        generator = rng.stream("evolution")
+        partners = np.full(len(rows), -1, dtype=np.int64)
+        found = others > 0
+        draws = first[found] + generator.integers(0, others[found])
+        draws += (own[found] >= 0) & (draws >= own[found])
+        partners[found] = members[draws]
+
+        if radius is not None and self.environment is not None:
+            for i, row in enumerate(rows.tolist()):
+                x, y = self.position[row]
+                nearby = self.environment.agents_within(int(x), int(y), radius)
+                nearby = nearby[(self.species[nearby] == codes[i]) & (nearby != row)]
+                if len(nearby):
+                    partners[i] = nearby[generator.integers(len(nearby))]
+        return partners
+
+    # -------------------- batched step kernel --------------------
+
+    def step(self, rows, actions, environment):
+        """
+        Applies one action per row (indices into constants.ACTIONS) for the whole
+        population at once. Mirrors Agent.perform_action.
+        """
+        # Movement in a random direction, clamped to the grid, costs speed / 10 energy
+        if "move" in constants.ACTIONS:
+            movers = rows[actions == constants.ACTIONS.index("move")]
+            directions = MOVE_DIRECTIONS[rng.stream("agents").integers(0, len(MOVE_DIRECTIONS), size=len(movers))]
+            new_positions = self.position[movers] + directions
+            np.clip(new_positions, 0, [environment.width - 1, environment.height - 1], out=new_positions)
+            self.move(movers, new_positions)
+            self.energy[movers] -= self.trait('speed', movers) / 10
+
+        # Eating gathers from the plant in the agent's cell, if there is one
+        if "eat" in constants.ACTIONS:
+            eaters = rows[actions == constants.ACTIONS.index("eat")]
+            x, y = self.position[eaters, 0], self.position[eaters, 1]
+            has_plant = environment.has_resource['plant'][y, x]
+            eaters, x, y = eaters[has_plant], x[has_plant], y[has_plant]
+            gathered = np.minimum(self.trait('intelligence', eaters), environment.nutritional_value['plant'])
+            self.energy[eaters] = np.minimum(self.energy[eaters] + gathered, constants.MAX_ENERGY)
+            environment.deplete_resources(x, y, 'plant', gathered)
+
+    def check_status(self, rows):
+        """Marks agents that ran out of energy or grew too old as dead. Returns those rows."""
+        dead = (self.energy[rows] <= settings.MIN_ENERGY) | (self.age[rows] >= settings.MAX_AGE)
+        self.set_alive(rows[dead], False)
+        return rows[dead]
+
+    def age_up(self, rows):
+        self.age[rows] += 1
@@ -1,17 +1,93 @@
-import random
+import os
+import ast
+import json
+import weakref
 import numpy as np
 from config import settings, constants
+from modules import rng
 from modules.agent import Agent 
+from modules.environment import HAZARD_CAP
+
+# Width of the health and energy bins in the states of the legacy JSON Q-table
+JSON_STATE_BIN = 25
+
+class StateEncoder:
+    """
+    Discretizes the continuous state inputs (health, energy, resource value and
+    hazard level) into bins of a fixed, configurable width, and maps the resulting
+    (health bin, energy bin, resource bin, hazard bin) tuple to a dense integer
+    index (mixed-radix encoding) so Q-values can live in a plain 2-D array.
+    Bins outside their range are clipped.
+    """
+    def __init__(self, health_bin=settings.STATE_HEALTH_BIN, energy_bin=settings.STATE_ENERGY_BIN,
+                 resource_bin=settings.STATE_RESOURCE_BIN, hazard_resolution=settings.STATE_HAZARD_RESOLUTION):
+        self.bin_sizes = (health_bin, energy_bin, resource_bin, hazard_resolution)
+        max_resources = settings.PLANT_NUTRITIONAL_VALUE + settings.WATER_NUTRITIONAL_VALUE + settings.MINERAL_NUTRITIONAL_VALUE
+        self.radices = tuple(
+            int(max_value / bin_size) + 1
+            for max_value, bin_size in zip((constants.MAX_HEALTH, constants.MAX_ENERGY, max_resources, HAZARD_CAP), self.bin_sizes)
+        )
+        self.n_states = int(np.prod(self.radices))
+
+    def discretize(self, health, energy, resources, hazard):
+        """Returns the state tuple of bins for one set of raw inputs."""
+        return tuple(int(value / bin_size) for value, bin_size in zip((health, energy, resources, hazard), self.bin_sizes))
+
+    def discretize_array(self, health, energy, resources, hazard):
+        """Vectorized discretize: one array per input, returns one bin array per component."""
+        return tuple(np.trunc(values / bin_size).astype(np.int64)
+                     for values, bin_size in zip((health, energy, resources, hazard), self.bin_sizes))
+
+    def encode(self, state):
+        """Returns the integer index of a state tuple."""
+        index = 0
+        for value, radix in zip(state, self.radices):
+            index = index * radix + min(max(int(value), 0), radix - 1)
+        return index
+
+    def encode_array(self, *components):
+        """Vectorized encode: one array per state component, returns an index array."""
+        index = np.zeros(len(components[0]), dtype=np.int64)
+        for values, radix in zip(components, self.radices):
+            index = index * radix + np.clip(np.trunc(values).astype(np.int64), 0, radix - 1)
+        return index
+
+    def decode_array(self, indices):
+        """Returns the state tuples for an array of indices as an [n, 4] array."""
+        return np.stack(np.unravel_index(indices, self.radices), axis=1)
+
+    def state_index(self):
+        """Returns every state tuple as an [n_states, 4] array, in index order."""
+        return self.decode_array(np.arange(self.n_states))
+
+
 class DecisionEngine:
     """
     A reinforcement learning-based decision engine for agents.
     Uses a simple Q-learning algorithm.
     """
     def __init__(self):
-        # Q-table: a dictionary mapping states to a dictionary of Q-values for actions.
-        self.q_table = {}
+        self.actions = list(constants.ACTIONS)
+        self.action_index = {action: i for i, action in enumerate(self.actions)}
+        # Q-table: one row of Q-values per encoded state, one column per action.
+        self.encoder = StateEncoder()
+        max_states = settings.Q_TABLE_MAX_STATES
+        self.bounded = max_states is not None and max_states < self.encoder.n_states
+        if self.bounded:
+            # Rows are slots handed out to states on first use and evicted least-recently-used
+            self.q_table = np.zeros((max_states, len(self.actions)))
+            self._slot_states = np.full(max_states, -1, dtype=np.int64)
+            self._slot_last_used = np.zeros(max_states, dtype=np.int64)
+            self._state_slots = {}
+            self._clock = 0
+        else:
+            self.q_table = np.zeros((self.encoder.n_states, len(self.actions)))
         # The exploration rate (epsilon) for the epsilon-greedy strategy.
         self.exploration_rate = settings.MAX_EXPLORATION_RATE
+        # False when the Q-table was loaded read-only for inference
+        self.training = True
+        # Per-agent memo of get_state, see _observe
+        self._state_cache = weakref.WeakKeyDictionary()
 
     def get_state(self, agent, environment):
         """
@@ -25,8 +101,21 @@ class DecisionEngine:
         Returns:
             tuple: A hashable representation of the state.
         """
+        return self._observe(agent, environment)[0]
+
+    def _observe(self, agent, environment):
+        """
+        Returns (state, total resource value, hazard level) for an agent's cell.
+        The result is memoized per agent and reused by choose_action, update
+        callers and get_reward until the agent moves, its health or energy
+        changes, or its cell's hazards or resources change.
+        """
         x, y = agent.position
-        
+        key = (environment, x, y, agent.health, agent.energy, environment.cell_version[y, x])
+        cached = self._state_cache.get(agent)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
         # Get local environmental data (e.g., resources and hazards in the current cell)
         current_cell_resources = environment.grid[y][x]['resources']
         current_cell_hazards = environment.grid[y][x]['hazards']
@@ -34,12 +123,115 @@ class DecisionEngine:
         # Sum the nutritional values of all resources in the cell to get a single state value
         total_resources_value = sum(res.nutritional_value for res in current_cell_resources.values())
 
-        # Simplify agent's state
-        simplified_health = int(agent.health / 25) # Bin health into 4 categories
-        simplified_energy = int(agent.energy / 25) # Bin energy into 4 categories
-        simplified_resources = int(total_resources_value / 25)
-        
-        return (simplified_health, simplified_energy, simplified_resources, current_cell_hazards)
+        # Simplify agent's state into bins of a fixed resolution
+        state = self.encoder.discretize(agent.health, agent.energy, total_resources_value, current_cell_hazards)
+        observation = (state, total_resources_value, current_cell_hazards)
+        self._state_cache[agent] = (key, observation)
+        return observation
+
+    def _rows(self, states):
+        """
+        Maps encoded states to Q-table rows. For a bounded table, states without a
+        slot get one, evicting the least recently used states when the table is full.
+        When one batch holds more distinct states than the table has slots, the
+        states left over get row -1: they read as all-zero Q-values and are not learned.
+        """
+        if not self.bounded:
+            return states
+
+        unique_states, inverse = np.unique(states, return_inverse=True)
+        slots = np.array([self._state_slots.get(state, -1) for state in unique_states.tolist()], dtype=np.int64)
+        self._clock += 1
+        self._slot_last_used[slots[slots >= 0]] = self._clock
+
+        missing = slots < 0
+        if missing.any():
+            slots[missing] = assigned = self._assign_slots(unique_states[missing])
+            self._slot_last_used[assigned[assigned >= 0]] = self._clock
+        return slots[inverse]
+
+    def _assign_slots(self, states):
+        # Free slots first, then the least recently used ones not touched in this batch
+        order = np.lexsort((self._slot_last_used, self._slot_states >= 0))
+        slots = order[:len(states)]
+        slots = slots[self._slot_last_used[slots] != self._clock]
+        unassigned = np.full(len(states) - len(slots), -1, dtype=np.int64)
+        states = states[:len(slots)]
+
+        for evicted in self._slot_states[slots][self._slot_states[slots] >= 0].tolist():
+            del self._state_slots[evicted]
+        self._state_slots.update(zip(states.tolist(), slots.tolist()))
+        self._slot_states[slots] = states
+        self.q_table[slots] = 0
+        return np.concatenate([slots, unassigned])
+
+    def _q_values(self, rows):
+        """Q-table rows for the given _rows result, with zeros for rows of -1."""
+        q_values = self.q_table[rows]
+        q_values[rows < 0] = 0
+        return q_values
+
+    def observe_cells(self, pool, environment, rows):
+        """
+        Looks up the total resource value and hazard level of each agent's cell once,
+        so encode_states and get_rewards can share them within a step.
+
+        Returns:
+            tuple: (resource values, hazard levels), one entry per row.
+        """
+        x, y = pool.position[rows, 0], pool.position[rows, 1]
+        return environment.resource_value_at(x, y), environment.hazards[y, x]
+
+    def encode_states(self, pool, environment, rows=None, cells=None):
+        """
+        Batched get_state + encode for agents stored in an AgentPool.
+
+        Args:
+            pool (AgentPool): The population.
+            environment (Environment): The current simulation environment.
+            rows (np.ndarray): Pool rows to encode; defaults to every live agent.
+            cells (tuple): The rows' observe_cells result, if already known.
+
+        Returns:
+            np.ndarray: One encoded state per row.
+        """
+        rows = pool.live_indices() if rows is None else rows
+        resource_values, hazards = cells if cells is not None else self.observe_cells(pool, environment, rows)
+        return self.encoder.encode_array(*self.encoder.discretize_array(
+            pool.health[rows],
+            pool.energy[rows],
+            resource_values,
+            hazards,
+        ))
+
+    def choose_actions(self, pool, environment, states=None):
+        """
+        Epsilon-greedy action selection for a whole population at once.
+
+        Exploring agents treat every action as a candidate, exploiting agents only
+        their best ones; ties are broken at random by a single masked argmax over
+        random keys. Each agent takes its draws from the "decisions" stream in the
+        same order as choose_action, so both pick the same actions for the same seed.
+
+        Args:
+            pool (AgentPool): The population.
+            environment (Environment): The current simulation environment.
+            states (np.ndarray): Encoded states of the live agents, if already known.
+
+        Returns:
+            np.ndarray: Action indices (into self.actions), aligned with pool.live_indices().
+        """
+        if states is None:
+            states = self.encode_states(pool, environment)
+
+        q_values = self._q_values(self._rows(states))
+        candidates = q_values == q_values.max(axis=1, keepdims=True)
+        # One row of draws per agent: the exploration draw, then the tie-breaking keys
+        draws = rng.stream("decisions").random((len(states), 1 + q_values.shape[1]))
+        candidates[draws[:, 0] < self.exploration_rate] = True
+
+        keys = np.where(candidates, draws[:, 1:], -1.0)
+        return keys.argmax(axis=1)
 
     def choose_action(self, agent, environment, actions):
         """
@@ -54,48 +246,206 @@ class DecisionEngine:
             str: The chosen action.
         """
         # Get the current state
-        state = self.get_state(agent, environment)
+        state = self._rows(np.array([self.encoder.encode(self.get_state(agent, environment))]))[0]
+
+        # Same draws as one agent's row in choose_actions: exploration, then a key per action
+        draws = rng.stream("decisions").random(1 + len(actions))
 
         # Exploration vs. Exploitation
-        if random.uniform(0, 1) < self.exploration_rate:
+        if draws[0] < self.exploration_rate:
             # Explore: choose a random action
-            return random.choice(actions)
+            return actions[draws[1:].argmax()]
         else:
-            # Exploit: choose the best action from the Q-table
-            if state not in self.q_table:
-                # If the state is new, initialize it with a default Q-value of 0 for all actions
-                self.q_table[state] = {action: 0 for action in actions}
-            
-            q_values = self.q_table[state]
-            # Find the action with the highest Q-value
-            max_q_value = max(q_values.values())
-            
+            # Exploit: choose the best action from the Q-table row
+            q_values = self._q_values(np.array([state]))[0]
+            if list(actions) != self.actions:
+                q_values = q_values[[self.action_index[action] for action in actions]]
+
             # Handle multiple actions with the same max Q-value
-            best_actions = [action for action, q_value in q_values.items() if q_value == max_q_value]
-            
-            return random.choice(best_actions)
+            best_actions = q_values == q_values.max()
+
+            return actions[np.where(best_actions, draws[1:], -1.0).argmax()]
 
     def update_q_table(self, state, action, reward, next_state):
         """
         Updates the Q-value for a state-action pair using the Q-learning formula.
+        States may be given as get_state tuples or as encoded indices.
         """
-        # Ensure the state and next_state exist in the Q-table
-        if state not in self.q_table:
-            self.q_table[state] = {a: 0 for a in constants.ACTIONS}
-        if next_state not in self.q_table:
-            self.q_table[next_state] = {a: 0 for a in constants.ACTIONS}
+        if not self.training:
+            return
+        state = state if isinstance(state, (int, np.integer)) else self.encoder.encode(state)
+        next_state = next_state if isinstance(next_state, (int, np.integer)) else self.encoder.encode(next_state)
+        state, next_state = self._rows(np.array([state, next_state]))
+        if state < 0:
+            return  # No room in a bounded table
+        action = self.action_index[action]
 
-        # Get the old Q-value
-        old_q_value = self.q_table[state][action]
-        
-        # Find the max Q-value for the next state
-        next_max_q = max(self.q_table[next_state].values())
+        # Get the old Q-value and the max Q-value for the next state
+        old_q_value = self.q_table[state, action]
+        next_max_q = self._q_values(np.array([next_state]))[0].max()
 
         # Q-learning formula
-        new_q_value = old_q_value + settings.LEARNING_RATE * (reward + settings.DISCOUNT_FACTOR * next_max_q - old_q_value)
-        
-        self.q_table[state][action] = new_q_value
+        self.q_table[state, action] = old_q_value + settings.LEARNING_RATE * (reward + settings.DISCOUNT_FACTOR * next_max_q - old_q_value)
     
+    def update_q_table_batch(self, states, actions, rewards, next_states):
+        """
+        Applies the Q-learning update for a whole step of transitions at once.
+
+        Every TD error is computed against the table as it was before the batch.
+        When several agents hit the same state-action pair, their TD errors are
+        averaged or summed according to settings.Q_BATCH_REDUCTION.
+
+        Args:
+            states (np.ndarray): Encoded states.
+            actions (np.ndarray): Action indices.
+            rewards (np.ndarray): Rewards received.
+            next_states (np.ndarray): Encoded states after acting.
+        """
+        if not self.training:
+            return
+        rows = self._rows(np.concatenate([states, next_states]))
+        states, next_states = rows[:len(states)], rows[len(states):]
+        # Transitions from states a bounded table had no room for are skipped
+        kept = states >= 0
+        states, actions, rewards, next_states = states[kept], actions[kept], rewards[kept], next_states[kept]
+        if not len(states):
+            return
+        td_errors = rewards + settings.DISCOUNT_FACTOR * self._q_values(next_states).max(axis=1) - self.q_table[states, actions]
+
+        pairs, inverse = np.unique(states * len(self.actions) + actions, return_inverse=True)
+        td_totals = np.bincount(inverse, weights=td_errors)
+        if settings.Q_BATCH_REDUCTION == "mean":
+            td_totals /= np.bincount(inverse)
+
+        pair_states, pair_actions = np.divmod(pairs, len(self.actions))
+        self.q_table[pair_states, pair_actions] += settings.LEARNING_RATE * td_totals
+
+    # -------------------- persistence --------------------
+
+    @staticmethod
+    def _state_index_path(path):
+        return os.path.splitext(path)[0] + "_states.npz"
+
+    def save_q_table(self, path=constants.Q_TABLE_PATH):
+        """
+        Saves the Q-table as a binary .npy file, plus a state-index file next to it
+        recording which state tuple and action each row and column stand for.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if self.bounded:
+            used = self._slot_states >= 0
+            table, states = np.asarray(self.q_table)[used], self.encoder.decode_array(self._slot_states[used])
+        else:
+            table, states = np.asarray(self.q_table), self.encoder.state_index()
+        np.save(path, table)
+        np.savez(self._state_index_path(path), states=states, actions=np.array(self.actions),
+                 bin_sizes=np.array(self.encoder.bin_sizes))
+        print(f"Q-table saved to {path}")
+
+    def load_q_table(self, path=constants.Q_TABLE_PATH, read_only=False):
+        """
+        Loads a Q-table saved by save_q_table.
+
+        With read_only=True the table is memory-mapped instead of read, so even very
+        large tables open instantly; learning is then switched off. If the saved layout
+        does not match the current state encoding, rows and columns are remapped into
+        a fresh in-memory table instead. When no binary table exists yet, the legacy
+        JSON table is imported once and saved in the binary format.
+
+        Returns:
+            bool: True if a table was loaded.
+        """
+        if not os.path.exists(path):
+            if path == constants.Q_TABLE_PATH and os.path.exists(constants.Q_TABLE_JSON_PATH):
+                self.import_json_q_table(constants.Q_TABLE_JSON_PATH)
+                self.save_q_table(path)
+                return True
+            return False
+
+        index = np.load(self._state_index_path(path))
+        saved_states, saved_actions = index['states'], index['actions'].tolist()
+        if tuple(index['bin_sizes'].tolist()) != self.encoder.bin_sizes:
+            raise ValueError(f"{path} was saved with a different state discretization")
+        table = np.load(path, mmap_mode='r' if read_only else None)
+
+        if not self.bounded and saved_actions == self.actions and np.array_equal(saved_states, self.encoder.state_index()):
+            self.q_table = table
+        else:
+            rows = self._rows(self.encoder.encode_array(*saved_states.T))
+            kept = rows >= 0  # A smaller bounded table keeps only the states it has room for
+            for column, action in enumerate(saved_actions):
+                if action in self.action_index:
+                    self.q_table[rows[kept], self.action_index[action]] = table[kept, column]
+        self.training = not read_only
+        return True
+
+    def import_json_q_table(self, json_path=constants.Q_TABLE_JSON_PATH):
+        """
+        One-time importer for the old JSON Q-table, keyed by stringified state tuples.
+        Entries that land on the same encoded state are averaged; unknown actions are skipped.
+
+        Returns:
+            int: The number of JSON states imported.
+        """
+        with open(json_path) as f:
+            raw_table = json.load(f)
+
+        totals = np.zeros_like(self.q_table)
+        counts = np.zeros_like(self.q_table)
+        keys = [ast.literal_eval(key) for key in raw_table]
+        # The JSON states hold health and energy bins JSON_STATE_BIN wide, raw resource values
+        # and hazard levels; convert them all to the current bins like get_state does
+        health_bin, energy_bin, resource_bin, hazard_bin = self.encoder.bin_sizes
+        states = self._rows(np.array([
+            self.encoder.encode((health * JSON_STATE_BIN / health_bin, energy * JSON_STATE_BIN / energy_bin,
+                                 resources / resource_bin, hazard / hazard_bin))
+            for health, energy, resources, hazard in keys
+        ]))
+        for state, q_values in zip(states.tolist(), raw_table.values()):
+            if state < 0:
+                continue  # No room in a bounded table
+            for action, q_value in q_values.items():
+                if action in self.action_index:
+                    totals[state, self.action_index[action]] += q_value
+                    counts[state, self.action_index[action]] += 1
+
+        seen = counts > 0
+        self.q_table[seen] = totals[seen] / counts[seen]
+        return len(raw_table)
+
+    def get_rewards(self, pool, environment, rows, actions, cells=None):
+        """
+        Batched get_reward for agents stored in an AgentPool.
+
+        Args:
+            pool (AgentPool): The population.
+            environment (Environment): The current simulation environment.
+            rows (np.ndarray): Pool rows of the acting agents.
+            actions (np.ndarray): Action indices taken by those agents.
+            cells (tuple): The rows' observe_cells result after acting, if already known.
+
+        Returns:
+            np.ndarray: The reward of each agent.
+        """
+        resource_values, hazards = cells if cells is not None else self.observe_cells(pool, environment, rows)
+        has_resources = resource_values > 0
+        rewards = np.zeros(len(rows))
+
+        gathering = actions == self.action_index.get("gather", -1)
+        rewards += np.where(gathering & has_resources, settings.REWARD_GATHER, 0)
+        rewards -= np.where(gathering & ~has_resources, settings.PENALTY_FAILED_ACTION, 0)
+
+        # Encourage moving towards resources and away from hazards
+        moving = actions == self.action_index.get("move", -1)
+        rewards += np.where(moving & has_resources, settings.REWARD_MOVE_TO_RESOURCE, 0)
+        rewards -= np.where(moving & (hazards > 0), settings.PENALTY_MOVE_TO_HAZARD, 0)
+
+        dead = ~pool.alive[rows]
+        if dead.any():
+            rewards[dead] = settings.PENALTY_DEATH
+
+        return rewards
+
     def get_reward(self, agent, environment, action):
         """
         Calculates the reward for a given action.
@@ -109,22 +459,21 @@ class DecisionEngine:
             float: The calculated reward.
         """
         reward = 0
-        x, y = agent.position
+        _, total_resources_value, hazards = self._observe(agent, environment)
         
         # Positive rewards
         if action == "gather":
             # Check if there are any resources in the current cell with a positive value
-            if any(res.nutritional_value > 0 for res in environment.grid[y][x]['resources'].values()):
+            if total_resources_value > 0:
                 reward += settings.REWARD_GATHER
             else:
                 reward -= settings.PENALTY_FAILED_ACTION
         
         if action == "move":
             # Encourage moving towards resources and away from hazards
-            total_resources_value = sum(res.nutritional_value for res in environment.grid[y][x]['resources'].values())
             if total_resources_value > 0:
                 reward += settings.REWARD_MOVE_TO_RESOURCE
-            if environment.grid[y][x]['hazards'] > 0:
+            if hazards > 0:
                 reward -= settings.PENALTY_MOVE_TO_HAZARD
 
         if not agent.alive:
@@ -108,52 +108,285 @@ class Environment:
             self.grid[oy][ox]["agents"].remove(agent)
         self.grid[ny][nx]["agents"].append(agent)
 """
-import random
-from config import settings
+import numpy as np
+from config import settings, constants
+from modules import rng
 from modules.utils import setup_directories
 from modules.resources import Plant, Water, Mineral
 
+RESOURCE_CLASSES = {"plant": Plant, "water": Water, "mineral": Mineral}
+# Chance that a cell starts with each resource type
+RESOURCE_SPAWN_CHANCE = {"plant": 0.3, "water": 0.2, "mineral": 0.15}
+# Pollution can only push a cell's hazard level up to this value
+HAZARD_CAP = 10
+
+
+class ResourceView:
+    """
+    A Resource-like handle onto one resource slot of the array-backed grid.
+    Reads and writes go straight to the environment's arrays.
+    """
+    def __init__(self, environment, resource_type, x, y):
+        self._env = environment
+        self.type = resource_type
+        self.position = (x, y)
+        self.nutritional_value = environment.nutritional_value[resource_type]
+
+    @property
+    def quantity(self):
+        x, y = self.position
+        return self._env.quantity[self.type][y, x]
+
+    @quantity.setter
+    def quantity(self, value):
+        x, y = self.position
+        self._env.quantity[self.type][y, x] = value
+        self._env.dirty[y, x] = True
+
+    @property
+    def regeneration_rate(self):
+        x, y = self.position
+        return self._env.regen_rate[self.type][y, x]
+
+    @regeneration_rate.setter
+    def regeneration_rate(self, value):
+        x, y = self.position
+        self._env.regen_rate[self.type][y, x] = value
+
+    def __repr__(self):
+        return f"Resource(type={self.type}, quantity={self.quantity}, pos={self.position})"
+
+
+class CellView:
+    """
+    Dict-like view of one grid cell, so code written against the old
+    list-of-dicts grid (cell['resources'], cell['hazards'], ...) keeps working.
+    """
+    KEYS = ('resources', 'hazards', 'pollution', 'agents')
+
+    def __init__(self, environment, x, y):
+        self._env = environment
+        self.x = x
+        self.y = y
+
+    def __getitem__(self, key):
+        env, x, y = self._env, self.x, self.y
+        if key == 'resources':
+            return {r_type: ResourceView(env, r_type, x, y)
+                    for r_type in constants.RESOURCE_TYPES if env.has_resource[r_type][y, x]}
+        if key == 'hazards':
+            return env.hazards[y, x]
+        if key == 'pollution':
+            return env.pollution[y, x]
+        if key == 'agents':
+            pool = env.agent_pool
+            return [pool.view(row) for row in env.agents_at(x, y)] if pool is not None else []
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'hazards':
+            self._env.hazards[self.y, self.x] = value
+            self._env.cell_version[self.y, self.x] += 1
+            self._env.dirty[self.y, self.x] = True
+        elif key == 'pollution':
+            self._env.pollution[self.y, self.x] = value
+        else:
+            raise KeyError(f"'{key}' cannot be assigned on a grid cell")
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def get(self, key, default=None):
+        return self[key] if key in self.KEYS else default
+
+
+class GridRow:
+    """One row of the grid accessor: grid[y][x] -> CellView."""
+    def __init__(self, environment, y):
+        self._env = environment
+        self.y = y
+
+    def __getitem__(self, x):
+        return CellView(self._env, x, self.y)
+
+    def __len__(self):
+        return self._env.width
+
+
+class GridView:
+    """Accessor layer exposing the array-backed grid as grid[y][x]."""
+    def __init__(self, environment):
+        self._env = environment
+
+    def __getitem__(self, y):
+        return GridRow(self._env, y)
+
+    def __len__(self):
+        return self._env.height
+
+
 class Environment:
     """
     Manages the grid-based world with multiple resource types, hazards, and pollution.
+    The world is stored as one NumPy array per quantity, indexed [y, x].
     """
     def __init__(self, width, height):
         self.width = width
         self.height = height
-        # Grid cell can now contain multiple resource types
-        self.grid = [[{'resources': {}, 'hazards': 0, 'pollution': 0, 'agents': []} for _ in range(width)] for _ in range(height)]
+        shape = (height, width)
+
+        self.hazards = np.zeros(shape)
+        self.pollution = np.zeros(shape)
+        self.has_resource = {r_type: np.zeros(shape, dtype=bool) for r_type in constants.RESOURCE_TYPES}
+        self.quantity = {r_type: np.zeros(shape) for r_type in constants.RESOURCE_TYPES}
+        self.regen_rate = {r_type: np.zeros(shape) for r_type in constants.RESOURCE_TYPES}
+
+        # Per-type defaults come from the Resource classes
+        self._prototypes = {r_type: cls(position=None) for r_type, cls in RESOURCE_CLASSES.items()}
+        self.nutritional_value = {r_type: proto.nutritional_value for r_type, proto in self._prototypes.items()}
+
+        # Bumped whenever a cell's hazard level or resource presence changes,
+        # so observers can tell whether what they saw of a cell is still current
+        self.cell_version = np.zeros(shape, dtype=np.int64)
+
+        # Cells whose look (resource presence or hazard level) changed since the
+        # renderer last collected them with pop_dirty_cells; everything starts dirty
+        self.dirty = np.ones(shape, dtype=bool)
+
+        # Occupancy index of the attached AgentPool (see AgentPool.attach): the live pool
+        # rows sorted by cell id (y * width + x). It is rebuilt with one argsort the first
+        # time it is queried after agents were born, moved or died.
+        self.agent_pool = None
+        self._indexed_layout = None
+        self._cell_ids = np.empty(0, dtype=np.int64)
+        self._cell_rows = np.empty(0, dtype=np.int64)
+        self.grid = GridView(self)
         self.weather = "normal"
         self._generate_terrain()
 
     def _generate_terrain(self):
         """Initializes the grid with various resources and hazards."""
-        for y in range(self.height):
-            for x in range(self.width):
-                # Distribute resources randomly
-                if random.random() < 0.3:
-                    self.grid[y][x]['resources']['plant'] = Plant(position=(x, y))
-                if random.random() < 0.2:
-                    self.grid[y][x]['resources']['water'] = Water(position=(x, y))
-                if random.random() < 0.15:
-                    self.grid[y][x]['resources']['mineral'] = Mineral(position=(x, y))
-                self.grid[y][x]['hazards'] = random.randint(0, 3)
+        shape = (self.height, self.width)
+        generator = rng.stream("environment")
+        for r_type, chance in RESOURCE_SPAWN_CHANCE.items():
+            proto = self._prototypes[r_type]
+            present = generator.random(shape) < chance
+            self.has_resource[r_type] = present
+            self.quantity[r_type] = np.where(present, float(proto.quantity), 0.0)
+            self.regen_rate[r_type] = np.where(present, float(proto.regeneration_rate), 0.0)
+        self.hazards = generator.integers(0, 4, size=shape).astype(float)
 
     def update_state(self):
         """Updates resources and hazards based on regeneration and pollution."""
-        for y in range(self.height):
-            for x in range(self.width):
-                # Regenerate resources
-                for r_type, resource in self.grid[y][x]['resources'].items():
-                    resource.quantity = min(settings.MAX_RESOURCE_CAPACITY, resource.quantity + resource.regeneration_rate)
-                
-                # Pollution increases hazards
-                self.grid[y][x]['hazards'] = min(10, self.grid[y][x]['hazards'] + self.grid[y][x]['pollution'] * 0.1)
-                
-                # Decay pollution over time
-                self.grid[y][x]['pollution'] = max(0, self.grid[y][x]['pollution'] - 0.5)
+        # Regenerate resources (absent slots have a zero rate and stay empty)
+        for r_type in constants.RESOURCE_TYPES:
+            quantity = self.quantity[r_type]
+            empty = quantity <= 0
+            np.add(quantity, self.regen_rate[r_type], out=quantity)
+            np.minimum(quantity, settings.MAX_RESOURCE_CAPACITY, out=quantity)
+            self.dirty |= empty & (quantity > 0)
+
+        # Pollution increases hazards
+        hazards = np.minimum(self.hazards + self.pollution * 0.1, HAZARD_CAP)
+        changed = hazards != self.hazards
+        self.cell_version += changed
+        self.dirty |= changed
+        self.hazards = hazards
+
+        # Decay pollution over time
+        np.maximum(self.pollution - 0.5, 0, out=self.pollution)
+
+    def add_resource(self, x, y, resource):
+        """Places a Resource object's quantity and regeneration rate into the grid."""
+        self.has_resource[resource.type][y, x] = True
+        self.cell_version[y, x] += 1
+        self.dirty[y, x] = True
+        self.quantity[resource.type][y, x] = resource.quantity
+        self.regen_rate[resource.type][y, x] = resource.regeneration_rate
 
     def deplete_resource(self, x, y, resource_type, amount):
         """Depletes a specific resource at a cell."""
-        if resource_type in self.grid[y][x]['resources']:
-            self.grid[y][x]['resources'][resource_type].quantity = max(0, self.grid[y][x]['resources'][resource_type].quantity - amount)
-            self.grid[y][x]['pollution'] += 1 # Action generates waste
+        if self.has_resource[resource_type][y, x]:
+            self.quantity[resource_type][y, x] = max(0, self.quantity[resource_type][y, x] - amount)
+            self.dirty[y, x] |= self.quantity[resource_type][y, x] <= 0
+            self.pollution[y, x] += 1 # Action generates waste
+
+    def deplete_resources(self, xs, ys, resource_type, amounts):
+        """Batched deplete_resource: several agents may take from the same cell."""
+        present = self.has_resource[resource_type][ys, xs]
+        xs, ys, amounts = xs[present], ys[present], amounts[present]
+        quantity = self.quantity[resource_type]
+        np.subtract.at(quantity, (ys, xs), amounts)
+        quantity[ys, xs] = np.maximum(quantity[ys, xs], 0)
+        self.dirty[ys, xs] |= quantity[ys, xs] <= 0
+        np.add.at(self.pollution, (ys, xs), 1)
+
+    def resource_value_at(self, xs, ys):
+        """Total nutritional value of the resources present at each (x, y)."""
+        return sum(self.has_resource[r_type][ys, xs] * value for r_type, value in self.nutritional_value.items())
+
+    def get_resource(self, x, y, resource_type):
+        """Returns the quantity of a resource at a cell, or None if the cell has none."""
+        if self.has_resource[resource_type][y, x]:
+            return self.quantity[resource_type][y, x]
+        return None
+
+    def add_pollution(self, x, y, amount):
+        self.pollution[y, x] += amount
+
+    def pop_dirty_cells(self):
+        """Returns (ys, xs) of the cells that changed look since the last call and clears them."""
+        ys, xs = np.nonzero(self.dirty)
+        self.dirty[:] = False
+        return ys, xs
+
+    # -------------------- agent occupancy --------------------
+
+    def _occupancy_index(self):
+        """(cell ids, rows) of the attached pool's live agents, sorted by cell id."""
+        pool = self.agent_pool
+        if pool is None:
+            return self._cell_ids[:0], self._cell_rows[:0]
+        if self._indexed_layout != (pool, pool.layout_version):
+            rows = pool.live_indices()
+            cell_ids = pool.position[rows, 1] * self.width + pool.position[rows, 0]
+            order = np.argsort(cell_ids, kind='stable')
+            self._cell_ids, self._cell_rows = cell_ids[order], rows[order]
+            self._indexed_layout = (pool, pool.layout_version)
+        return self._cell_ids, self._cell_rows
+
+    def _agents_in_ranges(self, starts, ends):
+        """Pool rows of the live agents whose cell id lies in one of the ascending, disjoint ranges [starts, ends)."""
+        cell_ids, rows = self._occupancy_index()
+        lo = np.searchsorted(cell_ids, starts)
+        counts = np.searchsorted(cell_ids, ends) - lo
+        # Concatenate the slices rows[lo:hi] with one gather
+        offsets = np.repeat(lo - np.cumsum(counts) + counts, counts)
+        return rows[offsets + np.arange(len(offsets))]
+
+    def agents_at(self, x, y):
+        """Pool rows of the live agents in cell (x, y)."""
+        cell_ids, rows = self._occupancy_index()
+        lo, hi = np.searchsorted(cell_ids, (y * self.width + x, y * self.width + x + 1))
+        return rows[lo:hi]
+
+    def agents_in_rect(self, x0, y0, x1, y1):
+        """Pool rows of the live agents with x0 <= x < x1 and y0 <= y < y1, one index range per grid row."""
+        x0, x1 = max(x0, 0), min(x1, self.width)
+        y0, y1 = max(y0, 0), min(y1, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return np.empty(0, dtype=np.int64)
+        row_starts = np.arange(y0, y1) * self.width
+        return self._agents_in_ranges(row_starts + x0, row_starts + x1)
+
+    def agents_within(self, x, y, radius):
+        """
+        Pool rows of the live agents whose cell lies within `radius` cells
+        (Euclidean) of (x, y). Each grid row of the disc is one index range.
+        """
+        reach = int(radius)
+        ys = np.arange(max(y - reach, 0), min(y + reach + 1, self.height))
+        half_widths = np.floor(np.sqrt(radius ** 2 - (ys - y) ** 2)).astype(np.int64)
+        row_starts = ys * self.width
+        return self._agents_in_ranges(row_starts + np.maximum(x - half_widths, 0),
+                                      row_starts + np.minimum(x + half_widths + 1, self.width))
@@ -1,7 +1,11 @@
-import random
-import uuid
+import numpy as np
+from modules import rng
 from modules.agent import Agent
-from config import settings
+from modules.agent_pool import AgentPool
+from config import constants, settings
+
+# Every name a child can get ("Child_1" to "Child_1000"), so a batch of names is one gather
+CHILD_NAMES = np.array([f"Child_{n}" for n in range(1001)], dtype=object)
 
 def genetic_distance(genome1, genome2):
     """
@@ -10,12 +14,13 @@ def genetic_distance(genome1, genome2):
     distance = sum(abs(g1 - g2) for g1, g2 in zip(genome1, genome2))
     return distance
 
-def reproduce(parent1, parent2):
+def reproduce(parent1, parent2, pool=None):
     """
     Performs sexual reproduction with crossover and mutation.
+    The child is stored in `pool` when one is given.
     """
     child_genome = []
-    crossover_point = random.randint(1, len(parent1.genome) - 1)
+    crossover_point = int(rng.stream("evolution").integers(1, len(parent1.genome)))
     child_genome.extend(parent1.genome[:crossover_point])
     child_genome.extend(parent2.genome[crossover_point:])
     
@@ -23,16 +28,17 @@ def reproduce(parent1, parent2):
     
     # Speciation check: if genetic distance is too high, it's a new species
     if genetic_distance(parent1.genome, parent2.genome) > settings.GENETIC_DISTANCE_THRESHOLD:
-        child_species_id = uuid.uuid4()
+        child_species_id = int(AgentPool.new_ids(1)[0])
     else:
         child_species_id = parent1.species_id
 
     child = Agent(
-        name=f"Child_{random.randint(1, 1000)}",
+        name=f"Child_{rng.stream('evolution').integers(1, 1001)}",
         genome=child_genome,
         species_id=child_species_id,
         position=parent1.position,
-        generation=max(parent1.generation, parent2.generation) + 1
+        generation=max(parent1.generation, parent2.generation) + 1,
+        pool=pool
     )
     return child
 
@@ -40,9 +46,53 @@ def mutate(genome):
     """
     Randomly mutates an agent's genes.
     """
+    generator = rng.stream("evolution")
     mutated_genome = genome[:]
     for i in range(len(mutated_genome)):
-        if random.random() < settings.MUTATION_RATE:
-            change = random.choice([-2, -1, 1, 2])
+        if generator.random() < settings.MUTATION_RATE:
+            change = int(generator.choice([-2, -1, 1, 2]))
             mutated_genome[i] = max(0, min(10, mutated_genome[i] + change))
     return mutated_genome
+
+def reproduce_batch(pool, parents1, parents2):
+    """
+    Batched reproduce for agents stored in an AgentPool: one child per pair of
+    parent rows, made with array operations and appended to the pool in one block.
+    Returns the children's rows.
+    """
+    parents1 = np.asarray(parents1, dtype=np.int64)
+    parents2 = np.asarray(parents2, dtype=np.int64)
+    count, genome_length = len(parents1), pool.genome_length
+    if not count:
+        return np.empty(0, dtype=np.int64)
+    genomes1, genomes2 = pool.genome[parents1], pool.genome[parents2]
+    generator = rng.stream("evolution")
+
+    # Single-point crossover: genes before each child's crossover point come from parent 1
+    crossover_points = generator.integers(1, genome_length, size=count)
+    from_parent1 = np.arange(genome_length) < crossover_points[:, None]
+    child_genomes = np.where(from_parent1, genomes1, genomes2)
+
+    # Mutation: each gene changes by one of -2, -1, 1, 2 with probability MUTATION_RATE
+    mutated = generator.random((count, genome_length)) < settings.MUTATION_RATE
+    changes = generator.choice([-2, -1, 1, 2], size=(count, genome_length))
+    child_genomes = np.where(mutated, np.clip(child_genomes + changes, 0, 10), child_genomes)
+
+    # Speciation check: children of genetically distant parents found a new species each,
+    # named by an unused ID like the species of founder agents. The new species are
+    # registered as one block before reading the parents' codes, which it may renumber.
+    distant = np.flatnonzero(np.abs(genomes1 - genomes2).sum(axis=1) > settings.GENETIC_DISTANCE_THRESHOLD)
+    founded = pool.new_species(AgentPool.new_ids(len(distant)))
+    species_codes = pool.species[parents1].copy()
+    species_codes[distant] = founded
+
+    return pool.add_batch(
+        names=CHILD_NAMES[generator.integers(1, 1001, size=count)],
+        agent_ids=AgentPool.new_ids(count),
+        health=constants.MAX_HEALTH,
+        energy=constants.MAX_ENERGY,
+        genomes=child_genomes,
+        species_codes=species_codes,
+        positions=pool.position[parents1],
+        generation=np.maximum(pool.generation[parents1], pool.generation[parents2]) + 1,
+    )
@@ -1,13 +1,17 @@
-import uuid
-import random
+import itertools
 from config import settings
 
+# Resource IDs are monotonic integers
+_resource_ids = itertools.count(1)
+
 class Resource:
     """
     A base class for all resources in the simulation.
     """
+    __slots__ = ('id', 'type', 'nutritional_value', 'position', 'is_depleted', 'regeneration_rate', 'quantity')
+
     def __init__(self, resource_type, nutritional_value, position):
-        self.id = uuid.uuid4()
+        self.id = next(_resource_ids)
         self.type = resource_type
         self.nutritional_value = nutritional_value
         self.position = position
@@ -26,6 +30,8 @@ class Plant(Resource):
     """
     A specific type of resource with high nutritional value.
     """
+    __slots__ = ()
+
     def __init__(self, position, quantity=100):
         self.quantity = quantity
         super().__init__("plant", settings.PLANT_NUTRITIONAL_VALUE, position)
@@ -35,6 +41,8 @@ class Water(Resource):
     """
     A specific type of resource that provides hydration.
     """
+    __slots__ = ()
+
     def __init__(self, position, quantity=100):
         self.quantity = quantity
         super().__init__("water", settings.WATER_NUTRITIONAL_VALUE, position)
@@ -44,6 +52,8 @@ class Mineral(Resource):
     """
     A specific type of resource with low nutritional value but high endurance.
     """
+    __slots__ = ()
+
     def __init__(self, position, quantity=100):
         self.quantity = quantity
         super().__init__("mineral", settings.MINERAL_NUTRITIONAL_VALUE, position)
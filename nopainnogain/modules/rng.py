@@ -0,0 +1,49 @@
+import numpy as np
+from config import settings
+
+# Every source of randomness draws from its own stream, so e.g. rendering
+# particles or adding a log sampler never shifts what the agents do
+SUBSYSTEMS = ("environment", "agents", "decisions", "evolution", "logging", "visualization")
+
+_run_seed = None
+_sequences = {}
+_streams = {}
+
+
+def seed_run(seed=None):
+    """
+    Seeds every subsystem stream from one run-level seed.
+
+    Args:
+        seed (int): The run seed. None draws a fresh one from the OS.
+
+    Returns:
+        int: The seed in use; passing it back replays the run.
+    """
+    global _run_seed
+    root = np.random.SeedSequence(seed)
+    _run_seed = root.entropy
+    _sequences.clear()
+    _streams.clear()
+    for name, sequence in zip(SUBSYSTEMS, root.spawn(len(SUBSYSTEMS))):
+        _sequences[name] = sequence
+        _streams[name] = np.random.Generator(np.random.PCG64(sequence))
+    return _run_seed
+
+
+def stream(name):
+    """The random Generator of a subsystem (one of SUBSYSTEMS)."""
+    if _run_seed is None:
+        seed_run(settings.SEED)
+    return _streams[name]
+
+
+def spawn_streams(name, count):
+    """
+    Independent Generators for `count` workers of a subsystem, e.g. one per
+    process of a parallel engine. Successive calls return fresh streams, in
+    the same order for the same run seed.
+    """
+    if _run_seed is None:
+        seed_run(settings.SEED)
+    return [np.random.Generator(np.random.PCG64(sequence)) for sequence in _sequences[name].spawn(count)]
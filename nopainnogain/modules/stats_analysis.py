@@ -1,26 +1,43 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-import os
 from config import constants
+from modules.utils import iter_logs, last_step, load_logs, log_columns, log_exists
 
-def plot_population_trends(sim_log_path, species_log_path):
+def plot_population_trends(sim_log_path, species_log_path, summary_path=None):
     """
     Plots the total population and population of each species over time.
     
     Args:
         sim_log_path (str): Path to the main simulation log CSV.
         species_log_path (str): Path to the species population log CSV.
+        summary_path (str): Path to the step summary. When it exists the total
+            population is read from it instead of counting raw simulation rows.
     """
-    if not os.path.exists(sim_log_path) or not os.path.exists(species_log_path):
+    use_summary = summary_path is not None and log_exists(summary_path)
+    if not (use_summary or log_exists(sim_log_path)) or not log_exists(species_log_path):
         print(f"Log files not found. Please run the simulation first.")
         return
 
-    sim_df = pd.read_csv(sim_log_path)
-    species_df = pd.read_csv(species_log_path)
+    if use_summary:
+        total_population_over_time = load_logs(summary_path, columns=['step', 'population']) \
+            .set_index('step')['population']
+    else:
+        # Stream the raw log chunk by chunk, merging the per-step partial counts
+        total_population_over_time = None
+        for chunk in iter_logs(sim_log_path, columns=['step']):
+            counts = chunk['step'].value_counts()
+            total_population_over_time = counts if total_population_over_time is None else \
+                total_population_over_time.add(counts, fill_value=0)
+        total_population_over_time = total_population_over_time.sort_index().astype('int64')
+
+    species_population = None
+    for chunk in iter_logs(species_log_path, columns=['step', 'species_id', 'population_size']):
+        sizes = chunk.groupby(['step', 'species_id'], observed=True)['population_size'].sum()
+        species_population = sizes if species_population is None else species_population.add(sizes, fill_value=0)
+    species_df = species_population.astype('int64').reset_index()
 
     # Plot total population
-    total_population_over_time = sim_df.groupby('step')['agent_id'].count()
     plt.figure(figsize=(12, 6))
     total_population_over_time.plot(title="Total Population Over Time", linestyle='-', marker='o')
     plt.xlabel("Time Step")
@@ -46,20 +63,19 @@ def plot_trait_distribution(sim_log_path, trait):
         sim_log_path (str): Path to the main simulation log CSV.
         trait (str): The name of the trait to plot (e.g., 'speed', 'intelligence').
     """
-    if not os.path.exists(sim_log_path):
+    if not log_exists(sim_log_path):
         print(f"Log file not found. Please run the simulation first.")
         return
-        
-    sim_df = pd.read_csv(sim_log_path)
-    
-    # Get data from the final step
-    final_step = sim_df['step'].max()
-    final_step_df = sim_df[sim_df['step'] == final_step]
-    
-    if trait not in final_step_df.columns:
+
+    if trait not in log_columns(sim_log_path):
         print(f"Trait '{trait}' not found in the simulation logs.")
         return
 
+    # Get data from the final step; the log is in step order, so the final step
+    # is read from its tail and only those rows are kept
+    final_step = last_step(sim_log_path)
+    final_step_df = load_logs(sim_log_path, columns=['species_id', trait], step_range=(final_step, final_step))
+
     plt.figure(figsize=(12, 6))
     sns.histplot(data=final_step_df, x=trait, kde=True, hue='species_id', multiple='dodge')
     plt.title(f"Distribution of {trait.capitalize()} Trait at End of Simulation")
@@ -67,25 +83,62 @@ def plot_trait_distribution(sim_log_path, trait):
     plt.ylabel("Frequency")
     plt.show()
 
+def plot_step_summary(summary_path):
+    """
+    Plots births and deaths, mean traits and action counts over time from the
+    step summary written by the simulator.
+    
+    Args:
+        summary_path (str): Path to the step summary CSV.
+    """
+    if not log_exists(summary_path):
+        print(f"Step summary not found. Please run the simulation first.")
+        return
+
+    summary_df = load_logs(summary_path).set_index('step')
+
+    summary_df[['births', 'deaths']].plot(figsize=(12, 6), title="Births and Deaths Over Time")
+    plt.xlabel("Time Step")
+    plt.ylabel("Agents")
+    plt.grid(True)
+    plt.show()
+
+    trait_columns = [column for column in summary_df.columns if column.startswith('mean_')]
+    summary_df[trait_columns].plot(figsize=(12, 6), title="Mean Traits Over Time")
+    plt.xlabel("Time Step")
+    plt.ylabel("Mean Value")
+    plt.grid(True)
+    plt.show()
+
+    action_columns = [column for column in summary_df.columns if column.startswith('action_')]
+    summary_df[action_columns].plot.area(figsize=(12, 6), title="Actions Taken Over Time")
+    plt.xlabel("Time Step")
+    plt.ylabel("Agents")
+    plt.grid(True)
+    plt.show()
+
 def main():
     """Main function to run the analysis scripts."""
     print("Starting simulation data analysis...")
-    sim_log_path = os.path.join(constants.DATA_DIR, 'simulation_logs.csv')
-    species_log_path = os.path.join(constants.DATA_DIR, 'species_logs.csv')
+    sim_log_path = constants.SIMULATION_LOG
+    species_log_path = constants.SPECIES_LOG
+    summary_path = constants.STEP_SUMMARY_LOG
     
     # Check if logs exist
-    if not os.path.exists(sim_log_path):
+    if not log_exists(summary_path) and not log_exists(sim_log_path):
         print(f"Simulation log file not found at: {sim_log_path}")
         print("Please run the main simulation first to generate data.")
         return
 
-    # Plot population trends
-    plot_population_trends(sim_log_path, species_log_path)
+    # Plot population trends and the rest of the per-step dashboard from the summary
+    plot_population_trends(sim_log_path, species_log_path, summary_path)
+    plot_step_summary(summary_path)
     
-    # Plot trait distributions for key traits
-    plot_trait_distribution(sim_log_path, 'speed')
-    plot_trait_distribution(sim_log_path, 'aggression')
-    plot_trait_distribution(sim_log_path, 'cooperation')
+    # Plot trait distributions for key traits; these need the raw per-agent rows
+    if log_exists(sim_log_path):
+        plot_trait_distribution(sim_log_path, 'speed')
+        plot_trait_distribution(sim_log_path, 'aggression')
+        plot_trait_distribution(sim_log_path, 'cooperation')
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
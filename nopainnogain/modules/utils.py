@@ -1,7 +1,79 @@
+import csv
 import os
+import queue
+import shutil
+import threading
+import numpy as np
 import pandas as pd
 import uuid
-from config import constants
+from config import constants, settings
+from modules import rng
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = pq = None
+
+# Column name -> dtype of each log file
+SIMULATION_LOG_SCHEMA = {
+    'step': np.int64,
+    'agent_id': np.int64,
+    'agent_name': object,
+    'species_id': object,
+    'health': np.float64,
+    'energy': np.float64,
+    'position_x': np.int64,
+    'position_y': np.int64,
+    'generation': np.int64,
+    'age': np.int64,
+    'speed': np.float64,
+    'intelligence': np.float64,
+    'aggression': np.float64,
+    'cooperation': np.float64,
+    'pollution_tolerance': np.float64,
+    'action': object,
+    'reward': np.float64,
+}
+SPECIES_LOG_SCHEMA = {
+    'step': np.int64,
+    'species_id': object,
+    'population_size': np.int64,
+}
+REWARDS_LOG_SCHEMA = {
+    'episode': np.int64,
+    'total_reward': np.float64,
+    'exploration_rate': np.float64,
+}
+
+# Per-species summary written instead of per-agent rows when LOG_LEVEL is "aggregate"
+AGGREGATE_TRAITS = ('speed', 'intelligence', 'aggression', 'energy')
+AGGREGATE_LOG_SCHEMA = {
+    'step': np.int64,
+    'species_id': object,
+    'count': np.int64,
+    **{f'{stat}_{trait}': np.float64 for trait in AGGREGATE_TRAITS for stat in ('mean', 'var')},
+    **{f'action_{action}': np.int64 for action in constants.ACTIONS},
+}
+
+# One row per step, written by the simulator whatever the LOG_LEVEL; per-species
+# counts for the same steps are in the species log
+STEP_SUMMARY_SCHEMA = {
+    'step': np.int64,
+    'population': np.int64,
+    'species': np.int64,
+    'births': np.int64,
+    'deaths': np.int64,
+    **{f'mean_{trait}': np.float64 for trait in AGGREGATE_TRAITS},
+    **{f'action_{action}': np.int64 for action in constants.ACTIONS},
+}
+
+# Granularity of the simulation log, see settings.LOG_LEVEL
+LOG_LEVELS = ("full", "sampled", "aggregate")
+
+# Repetitive string columns stored as dictionary indices in Parquet logs
+DICTIONARY_COLUMNS = ('agent_name', 'species_id', 'action')
 
 def setup_directories():
     """
@@ -11,7 +83,210 @@ def setup_directories():
     os.makedirs(constants.LOG_DIR, exist_ok=True)
     os.makedirs(constants.REPORTS_DIR, exist_ok=True)
 
-def log_agent_data(df, agent, step, action, reward):
+class LogWriter:
+    """
+    Streams log rows to disk in fixed-size chunks.
+
+    Rows are collected in preallocated per-column buffers. Whenever the buffers
+    fill up they are written out as one chunk and reused, so memory stays bounded
+    and appending a row costs the same at step 10 as at step 10 million.
+
+    With log_format "csv" chunks are appended to one CSV file. With "parquet" the
+    log becomes a directory (the file path without its extension) holding one
+    subdirectory per range of `partition_size` steps; every chunk adds a
+    zstd-compressed Parquet file to each range it touches, with the repetitive
+    string columns dictionary-encoded. See load_logs for reading either format.
+
+    With background=True finished chunks are serialized and written by a writer
+    thread fed through a queue of at most `queue_size` chunks, so disk I/O overlaps
+    with the simulation. When the queue is full the overflow policy decides:
+    "block" waits for the writer (no data loss), "aggregate" drops the chunk's rows
+    and keeps only per-step (and per-species) counts and means, which close() writes
+    to "<log>_dropped.csv".
+    """
+    def __init__(self, filepath, schema, chunk_size=settings.LOG_CHUNK_SIZE,
+                 log_format=None, partition_size=settings.LOG_PARTITION_STEPS,
+                 background=settings.LOG_BACKGROUND_WRITER, queue_size=settings.LOG_QUEUE_SIZE,
+                 overflow=settings.LOG_QUEUE_POLICY):
+        self.log_format = settings.LOG_FORMAT if log_format is None else log_format
+        if self.log_format not in ("csv", "parquet"):
+            raise ValueError(f"Unknown log format '{self.log_format}'. Expected 'csv' or 'parquet'.")
+        if overflow not in ("block", "aggregate"):
+            raise ValueError(f"Unknown log queue policy '{overflow}'. Expected 'block' or 'aggregate'.")
+        if self.log_format == "parquet":
+            if pq is None:
+                raise ImportError("Parquet logs require pyarrow. Install it or set LOG_FORMAT = \"csv\".")
+            filepath = os.path.splitext(filepath)[0]
+        self.filepath = filepath
+        self.schema = schema
+        self.chunk_size = chunk_size
+        self.partition_size = partition_size
+        self.partition_column = next(iter(schema))  # 'step' (or 'episode' for rewards)
+        self._chunks_written = 0
+        self.rows_written = 0
+        self._buffers = {column: np.empty(chunk_size, dtype=dtype) for column, dtype in schema.items()}
+        self._count = 0
+        self._flushed = False
+        self._started = False
+        self.closed = False
+
+        # Background writer; chunks that overflow an "aggregate" queue end up in _dropped
+        self.overflow = overflow
+        self.rows_dropped = 0
+        self._dropped = []
+        self._queue = None
+        self._thread = None
+        self._error = None
+        if background:
+            self._queue = queue.Queue(maxsize=max(1, queue_size))
+            self._thread = threading.Thread(target=self._drain, name=f"LogWriter({os.path.basename(filepath)})",
+                                            daemon=True)
+            self._thread.start()
+
+    def __len__(self):
+        return self.rows_written + self._count
+
+    def append(self, row):
+        """Adds a single row given as a dict of column -> value."""
+        for column, buffer in self._buffers.items():
+            buffer[self._count] = row[column]
+        self._count += 1
+        if self._count == self.chunk_size:
+            self.flush()
+
+    def append_columns(self, columns):
+        """Adds a batch of rows given as a dict of column -> array (scalars are broadcast)."""
+        n_rows = max((len(values) for values in columns.values() if np.ndim(values)), default=1)
+        start = 0
+        while start < n_rows:
+            take = min(self.chunk_size - self._count, n_rows - start)
+            for column, buffer in self._buffers.items():
+                values = columns[column]
+                buffer[self._count:self._count + take] = values[start:start + take] if np.ndim(values) else values
+            self._count += take
+            start += take
+            if self._count == self.chunk_size:
+                self.flush()
+
+    def flush(self, block=False):
+        """
+        Writes the buffered rows to disk as one chunk (or hands it to the writer thread).
+        With block=True the chunk waits for room in the queue even under the "aggregate" policy.
+        """
+        if self._count == 0 and self._flushed:
+            return
+        # Copy out of the buffers, which are refilled while the chunk waits to be written
+        chunk = pd.DataFrame({column: buffer[:self._count].copy() for column, buffer in self._buffers.items()})
+        count, self._count = self._count, 0
+        self._flushed = True
+        if self._queue is None:
+            self._write_chunk(chunk)
+        elif self.overflow == "block" or block:
+            self._raise_writer_error()
+            self._queue.put(chunk)
+        else:
+            self._raise_writer_error()
+            try:
+                self._queue.put_nowait(chunk)
+            except queue.Full:
+                self._drop(chunk)
+                return
+        self.rows_written += count
+
+    def _drain(self):
+        """Writer thread: writes queued chunks until it receives None."""
+        while True:
+            chunk = self._queue.get()
+            try:
+                if chunk is None:
+                    return
+                if self._error is None:
+                    self._write_chunk(chunk)
+            except BaseException as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _raise_writer_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"Writing log {self.filepath} failed") from error
+
+    def _drop(self, chunk):
+        """Reduces a chunk that did not fit in the queue to per-group counts and sums."""
+        keys = [self.partition_column] + (['species_id'] if 'species_id' in chunk.columns else [])
+        numeric = [column for column in chunk.columns
+                   if column not in keys and pd.api.types.is_numeric_dtype(chunk[column])]
+        groups = chunk.groupby(keys, sort=False)
+        summary = groups[numeric].sum()
+        summary.insert(0, 'rows', groups.size())
+        self._dropped.append(summary)
+        self.rows_dropped += len(chunk)
+
+    def _write_dropped(self):
+        if not self._dropped:
+            return
+        summary = pd.concat(self._dropped).groupby(level=list(range(self._dropped[0].index.nlevels))).sum()
+        means = summary.drop(columns='rows').div(summary['rows'], axis=0)
+        means.insert(0, 'rows', summary['rows'])
+        path = f"{os.path.splitext(self.filepath)[0]}_dropped.csv"
+        means.sort_index().reset_index().to_csv(path, index=False)
+        print(f"Log queue overflowed: {self.rows_dropped} rows of {self.filepath} kept only as aggregates in {path}")
+
+    def _write_chunk(self, chunk):
+        if self.log_format == "parquet":
+            self._write_parquet_chunk(chunk)
+        else:
+            # The first chunk truncates the file and writes the header
+            os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+            chunk.to_csv(self.filepath, mode='a' if self._started else 'w', header=not self._started, index=False)
+        self._started = True
+        self._chunks_written += 1
+
+    def _write_parquet_chunk(self, chunk):
+        # The first chunk replaces the partitions of any previous run
+        if not self._started and os.path.isdir(self.filepath):
+            shutil.rmtree(self.filepath)
+        os.makedirs(self.filepath, exist_ok=True)
+        table = pa.table({
+            column: pa.array(values.astype(str)).dictionary_encode() if column in DICTIONARY_COLUMNS
+            else pa.array(values)
+            for column, values in chunk.items()
+        })
+
+        # Chunks arrive in step order, so each partition is one contiguous slice
+        partitions = chunk[self.partition_column].to_numpy() // self.partition_size
+        starts = np.flatnonzero(np.diff(partitions, prepend=-1))
+        ends = np.append(starts[1:], len(partitions))
+        for start, end in zip(starts, ends):
+            directory = os.path.join(self.filepath, partition_name(partitions[start], self.partition_size))
+            os.makedirs(directory, exist_ok=True)
+            pq.write_table(table.slice(start, end - start),
+                           os.path.join(directory, f"part-{self._chunks_written:05d}.parquet"),
+                           compression="zstd")
+
+    def close(self):
+        """Final flush; waits for the writer thread to finish. Safe to call more than once."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.flush(block=True)  # The last chunk is never dropped
+        finally:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+            self._write_dropped()
+        self._raise_writer_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def log_agent_data(log, agent, step, action, reward):
     
     new_row = {
         'step': step,
@@ -32,30 +307,271 @@ def log_agent_data(df, agent, step, action, reward):
         'action': action,
         'reward': reward
     }
-    # Use .loc to append a single row, which is a modern and efficient approach.
-    df.loc[len(df)] = new_row
-    return df
+    log.append(new_row)
+    return log
+
+def log_population_data(log, pool, rows, step, actions, rewards):
+    """
+    Logs one row per agent for a whole AgentPool step in a single batch.
+
+    Args:
+        log (LogWriter): The simulation log.
+        pool (AgentPool): The population.
+        rows (np.ndarray): Pool rows of the agents that acted.
+        step (int): The current step.
+        actions (np.ndarray): Action names taken, aligned with rows.
+        rewards (np.ndarray): Rewards received, aligned with rows.
+    """
+    log.append_columns({
+        'step': step,
+        'agent_id': pool.ids[rows],
+        'agent_name': pool.names[rows],
+        'species_id': pool.species_ids[pool.species[rows]],
+        'health': pool.health[rows],
+        'energy': pool.energy[rows],
+        'position_x': pool.position[rows, 0],
+        'position_y': pool.position[rows, 1],
+        'generation': pool.generation[rows],
+        'age': pool.age[rows],
+        'speed': pool.trait('speed', rows),
+        'intelligence': pool.trait('intelligence', rows),
+        'aggression': pool.trait('aggression', rows),
+        'cooperation': pool.trait('cooperation', rows),
+        'pollution_tolerance': pool.trait('pollution_tolerance', rows),
+        'action': actions,
+        'reward': rewards,
+    })
+    return log
+
+def sample_rows(rows, step, every=settings.LOG_SAMPLE_EVERY, fraction=settings.LOG_SAMPLE_FRACTION):
+    """
+    Picks which agents get a row in a "sampled" simulation log: every agent on
+    every `every`-th step, thinned to a random `fraction` of them.
+
+    Returns:
+        np.ndarray: Positions into rows of the agents to log.
+    """
+    if step % every:
+        return np.empty(0, dtype=np.int64)
+    if fraction >= 1:
+        return np.arange(len(rows))
+    return np.flatnonzero(rng.stream("logging").random(len(rows)) < fraction)
 
-def log_species_data(df, species_id, step, population_size):
+def log_species_aggregates(log, pool, rows, step, actions):
+    """
+    Logs one row per species for a whole AgentPool step: the head count, the mean
+    and variance of the AGGREGATE_TRAITS and how often each action was taken.
+
+    Args:
+        log (LogWriter): A log with AGGREGATE_LOG_SCHEMA.
+        pool (AgentPool): The population.
+        rows (np.ndarray): Pool rows of the agents that acted.
+        step (int): The current step.
+        actions (np.ndarray): Action indices taken, aligned with rows.
+    """
+    codes, groups, counts = np.unique(pool.species[rows], return_inverse=True, return_counts=True)
+    columns = {
+        'step': step,
+        'species_id': pool.species_ids[codes],
+        'count': counts,
+    }
+    for trait in AGGREGATE_TRAITS:
+        values = pool.energy[rows] if trait == 'energy' else pool.trait(trait, rows)
+        mean = np.bincount(groups, weights=values, minlength=len(codes)) / counts
+        mean_square = np.bincount(groups, weights=values * values, minlength=len(codes)) / counts
+        columns[f'mean_{trait}'] = mean
+        columns[f'var_{trait}'] = np.maximum(mean_square - mean * mean, 0)
+    n_actions = len(constants.ACTIONS)
+    histogram = np.bincount(groups * n_actions + actions, minlength=len(codes) * n_actions)
+    histogram = histogram.reshape(len(codes), n_actions)
+    for index, action in enumerate(constants.ACTIONS):
+        columns[f'action_{action}'] = histogram[:, index]
+    log.append_columns(columns)
+    return log
+
+def log_step_summary(log, pool, rows, step, actions, births, deaths):
+    """
+    Logs the one-row summary of a step: how many agents acted and of how many
+    species, the births and deaths during the step, the agents' mean traits and
+    how often each action was taken.
+
+    Args:
+        log (LogWriter): A log with STEP_SUMMARY_SCHEMA.
+        pool (AgentPool): The population.
+        rows (np.ndarray): Pool rows of the agents that acted.
+        step (int): The current step.
+        actions (np.ndarray): Action indices taken, aligned with rows.
+        births (int): Agents born during the step.
+        deaths (int): Agents that died during the step.
+    """
+    row = {
+        'step': step,
+        'population': len(rows),
+        'species': len(np.unique(pool.species[rows])),
+        'births': births,
+        'deaths': deaths,
+    }
+    for trait in AGGREGATE_TRAITS:
+        values = pool.energy[rows] if trait == 'energy' else pool.trait(trait, rows)
+        row[f'mean_{trait}'] = values.mean() if len(rows) else np.nan
+    histogram = np.bincount(actions, minlength=len(constants.ACTIONS))
+    for index, action in enumerate(constants.ACTIONS):
+        row[f'action_{action}'] = histogram[index]
+    log.append(row)
+    return log
+
+def log_species_data(log, species_id, step, population_size):
     
     new_row = {
         'step': step,
         'species_id': species_id,
         'population_size': population_size
     }
-    # Use .loc to append a single row, which is a modern and efficient approach.
-    df.loc[len(df)] = new_row
-    return df
+    log.append(new_row)
+    return log
+
+def partition_name(partition, partition_size):
+    """Directory name of the Parquet partition holding steps [first, last]."""
+    first = int(partition) * partition_size
+    return f"{first:09d}-{first + partition_size - 1:09d}"
+
+def _parquet_directory(filepath):
+    """Returns the Parquet directory of a log if it was written in that format, else None."""
+    directory = os.path.splitext(filepath)[0]
+    if os.path.isfile(filepath) or not os.path.isdir(directory):
+        return None
+    if pq is None:
+        raise ImportError(f"Reading the Parquet log at {directory} requires pyarrow.")
+    return directory
+
+def _parquet_files(directory, step_range=None):
+    """Parquet files of the partitions overlapping step_range, in step order."""
+    files = []
+    for name in sorted(os.listdir(directory)):
+        first, last = (int(bound) for bound in name.split("-"))
+        if step_range is None or (first <= step_range[1] and last >= step_range[0]):
+            part = os.path.join(directory, name)
+            files.extend(os.path.join(part, file) for file in sorted(os.listdir(part)))
+    return files
+
+def _csv_dtypes(columns):
+    """Explicit read dtypes for known log columns; repetitive strings become categories."""
+    dtypes = {}
+    for schema in (SIMULATION_LOG_SCHEMA, SPECIES_LOG_SCHEMA, REWARDS_LOG_SCHEMA, AGGREGATE_LOG_SCHEMA,
+                   STEP_SUMMARY_SCHEMA):
+        for column, dtype in schema.items():
+            if columns is None or column in columns:
+                dtypes[column] = 'category' if column in DICTIONARY_COLUMNS else dtype
+    return dtypes
+
+def log_exists(filepath):
+    """True if a log was written at filepath as CSV or as a Parquet directory."""
+    return os.path.isfile(filepath) or os.path.isdir(os.path.splitext(filepath)[0])
+
+def log_columns(filepath):
+    """Column names of a log, read from its header or Parquet schema only."""
+    directory = _parquet_directory(filepath)
+    if directory is None:
+        return list(pd.read_csv(filepath, nrows=0).columns)
+    files = _parquet_files(directory)
+    return pq.read_schema(files[0]).names if files else []
+
+def last_step(filepath, step_column='step'):
+    """
+    Returns the last step recorded in a log without loading it.
+
+    Logs are written in step order, so for CSV this reads the file backwards up
+    to its last line; for Parquet it only opens the last step partition.
+    """
+    directory = _parquet_directory(filepath)
+    if directory is not None:
+        for name in sorted(os.listdir(directory), reverse=True):
+            part = os.path.join(directory, name)
+            steps = [pq.read_table(os.path.join(part, file), columns=[step_column]).column(0)
+                     for file in sorted(os.listdir(part))]
+            steps = [column for column in steps if len(column)]
+            if steps:
+                return max(int(pa.compute.max(column).as_py()) for column in steps)
+        return None
+
+    header = log_columns(filepath)
+    with open(filepath, 'rb') as file:
+        file.seek(0, os.SEEK_END)
+        position, tail, lines = file.tell(), b'', []
+        while position > 0:
+            size = min(4096, position)
+            position -= size
+            file.seek(position)
+            tail = file.read(size) + tail
+            lines = tail.rstrip(b'\r\n').split(b'\n')
+            if len(lines) > 1:
+                break
+    if len(lines) < 2:
+        return None  # Header only
+    last_row = next(csv.reader([lines[-1].decode()]))
+    return int(last_row[header.index(step_column)])
+
+def iter_logs(filepath, columns=None, chunk_size=settings.ANALYSIS_CHUNK_SIZE, step_range=None):
+    """
+    Streams a log written by LogWriter in chunks of at most chunk_size rows.
+
+    Only the requested columns are parsed, with explicit dtypes. For Parquet logs
+    only the partitions overlapping step_range are opened; rows are not filtered.
+
+    Yields:
+        DataFrame: The next chunk of the log.
+    """
+    directory = _parquet_directory(filepath)
+    if directory is None:
+        yield from pd.read_csv(filepath, usecols=columns, dtype=_csv_dtypes(columns), chunksize=chunk_size)
+        return
+    for file in _parquet_files(directory, step_range):
+        for batch in pq.ParquetFile(file).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+
+def load_logs(filepath, columns=None, step_range=None, step_column='step'):
+    """
+    Loads a log written by LogWriter in either format.
+
+    For Parquet logs only the requested columns are read, and only the step
+    partitions overlapping step_range are opened. CSV logs are streamed in
+    chunks so that only the rows inside step_range are kept in memory.
+
+    Args:
+        filepath (str): The log's CSV path (its Parquet directory is the same path without the extension).
+        columns (list): Columns to load. Defaults to all of them.
+        step_range (tuple): Inclusive (first, last) steps to keep. Defaults to every step.
+        step_column (str): The column step_range applies to ('episode' for rewards logs).
+
+    Returns:
+        DataFrame: The requested part of the log.
+    """
+    read_columns = columns
+    if columns is not None and step_range is not None and step_column not in columns:
+        read_columns = list(columns) + [step_column]
+    chunks = []
+    for chunk in iter_logs(filepath, read_columns, step_range=step_range):
+        if step_range is not None:
+            chunk = chunk[chunk[step_column].between(*step_range)]
+        chunks.append(chunk[columns] if read_columns is not columns else chunk)
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(chunks, ignore_index=True)
 
-def save_logs(df, filepath):
+def save_logs(log, filepath):
     """
-    Saves a DataFrame to a CSV file.
+    Saves a log to a CSV file. For a LogWriter this is the final flush of
+    the chunks it has been streaming to its own file.
     
     Args:
-        df (DataFrame): The DataFrame to save.
+        log (LogWriter or DataFrame): The log to save.
         filepath (str): The full path to the file to save to.
     """
-    df.to_csv(filepath, index=False)
+    if isinstance(log, LogWriter):
+        log.close()
+        filepath = log.filepath
+    else:
+        log.to_csv(filepath, index=False)
     print(f"Log saved to {filepath}")
 
 def generate_unique_id():
@@ -1,7 +1,71 @@
 import pygame
-import random
 import math
+import numpy as np
 from config import settings, constants
+from modules import rng
+from modules.agent import species_color
+
+# Terrain base colors (settings.COLORS keys) by the index _terrain_colors assigns
+TERRAIN_PALETTE = ("ground", "resource_mineral", "resource_water", "resource_plant")
+# Death particles: how many per death, starting lifetime (= alpha) and fade per frame
+PARTICLES_PER_DEATH = 30
+PARTICLE_LIFETIME = 255
+PARTICLE_FADE = 5
+# Transparent color of the agent sprites; agent and horn colors never have a zero green channel
+SPRITE_COLORKEY = (255, 0, 255)
+# Agent colors are drawn rounded to this many levels per channel, which bounds the number of sprites
+SPRITE_COLOR_LEVELS = 16
+
+
+class Camera:
+    """
+    The part of the world shown on screen: the world point at the top-left corner
+    of the screen, in pixels at zoom 1 (TILE_SIZE per cell), and a zoom factor.
+    """
+    def __init__(self, world_size, screen_size, zoom=1.0):
+        self.world_width, self.world_height = world_size
+        self.screen_width, self.screen_height = screen_size
+        # Zooming out stops once the whole world fits on screen
+        self.min_zoom = min(1.0, self.screen_width / self.world_width, self.screen_height / self.world_height)
+        self.max_zoom = settings.CAMERA_MAX_ZOOM
+        self.x = 0.0
+        self.y = 0.0
+        self.zoom = zoom
+        self._clamp()
+
+    def _clamp(self):
+        self.zoom = min(max(self.zoom, self.min_zoom), self.max_zoom)
+        self.x = min(max(self.x, 0.0), max(self.world_width - self.screen_width / self.zoom, 0.0))
+        self.y = min(max(self.y, 0.0), max(self.world_height - self.screen_height / self.zoom, 0.0))
+
+    def pan(self, dx, dy):
+        """Moves the view by (dx, dy) screen pixels."""
+        self.x += dx / self.zoom
+        self.y += dy / self.zoom
+        self._clamp()
+
+    def zoom_by(self, factor, anchor=None):
+        """Zooms by `factor`, keeping the world point under `anchor` (screen pixels, default: center) in place."""
+        ax, ay = anchor if anchor is not None else (self.screen_width / 2, self.screen_height / 2)
+        world_x, world_y = self.x + ax / self.zoom, self.y + ay / self.zoom
+        self.zoom *= factor
+        self._clamp()
+        self.x, self.y = world_x - ax / self.zoom, world_y - ay / self.zoom
+        self._clamp()
+
+    def visible_cells(self, width, height):
+        """Cell range (x0, y0, x1, y1), end-exclusive, that overlaps the screen."""
+        tile = settings.TILE_SIZE
+        x0 = max(int(self.x // tile), 0)
+        y0 = max(int(self.y // tile), 0)
+        x1 = min(math.ceil((self.x + self.screen_width / self.zoom) / tile), width)
+        y1 = min(math.ceil((self.y + self.screen_height / self.zoom) / tile), height)
+        return x0, y0, x1, y1
+
+    def to_screen(self, world_points):
+        """Screen pixels of world-pixel points given as an (n, 2) array."""
+        return (np.asarray(world_points, dtype=float) - (self.x, self.y)) * self.zoom
+
 
 class Visualization:
    
@@ -9,18 +73,67 @@ class Visualization:
         pygame.init()
         self.screen = pygame.display.set_mode((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
         pygame.display.set_caption("AI Ecosystem Simulator")
+        pygame.key.set_repeat(200, 30)
         self.environment = environment
-        self.death_particles = []
+        self.camera = Camera((environment.width * settings.TILE_SIZE, environment.height * settings.TILE_SIZE),
+                             self.screen.get_size())
 
-    def render(self, agents):
+        # Death particles as parallel arrays, drawn with one pre-rendered sprite per alpha value
+        self.particle_position = np.empty((0, 2))
+        self.particle_velocity = np.empty((0, 2))
+        self.particle_lifetime = np.empty(0, dtype=np.int64)
+        self.particle_sprites = []
+        for alpha in range(256):
+            sprite = pygame.Surface((5, 5), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, settings.COLORS["death_particle"] + (alpha,), (2, 2), 2)
+            self.particle_sprites.append(sprite.convert_alpha())
+
+        # Agent sprites, rendered on first use per (color level, predator, energy bucket, tile size)
+        self.agent_sprites = {}
+        # Look of each species code of the drawn pool (see _species_looks)
+        self.species_looks = np.empty(0, dtype=np.int64)
+        self._looks_of = None
+
+        # Terrain is cached as one color per cell; only cells the environment marks
+        # dirty are recomputed, starting with all of them. Zoomed-out views use
+        # block-averaged copies, keyed by block size and kept up to date the same way.
+        self.terrain_image = np.zeros((environment.height, environment.width, 3), dtype=np.uint8)
+        self.terrain_levels = {}
+        environment.dirty[:] = True
+
+    def handle_event(self, event):
+        """Camera controls: arrows/WASD or right-drag to pan, mouse wheel or +/- to zoom, Home to reset."""
+        camera = self.camera
+        if event.type == pygame.KEYDOWN:
+            step = settings.CAMERA_PAN_SPEED
+            pans = {pygame.K_LEFT: (-step, 0), pygame.K_a: (-step, 0), pygame.K_RIGHT: (step, 0),
+                    pygame.K_d: (step, 0), pygame.K_UP: (0, -step), pygame.K_w: (0, -step),
+                    pygame.K_DOWN: (0, step), pygame.K_s: (0, step)}
+            if event.key in pans:
+                camera.pan(*pans[event.key])
+            elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                camera.zoom_by(settings.CAMERA_ZOOM_STEP)
+            elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                camera.zoom_by(1 / settings.CAMERA_ZOOM_STEP)
+            elif event.key == pygame.K_HOME:
+                camera.x, camera.y, camera.zoom = 0.0, 0.0, 1.0
+                camera._clamp()
+        elif event.type == pygame.MOUSEWHEEL:
+            camera.zoom_by(settings.CAMERA_ZOOM_STEP ** event.y, pygame.mouse.get_pos())
+        elif event.type == pygame.MOUSEMOTION and (event.buttons[1] or event.buttons[2]):
+            camera.pan(-event.rel[0], -event.rel[1])
+
+    def render(self, agents, pool=None):
         self.screen.fill(settings.COLORS["background"])
         
         # Draw the environment
         self._draw_grid()
         
-        # Draw agents
-        for agent in agents:
-            self._draw_agent(agent)
+        # Draw agents, straight from the pool's arrays when it is given
+        if pool is not None:
+            self._draw_pool(pool)
+        else:
+            self._draw_agents(agents)
 
         # Update and draw death particles
         self._update_and_draw_particles()
@@ -31,83 +144,264 @@ class Visualization:
        
         x, y = position
         center = (x * settings.TILE_SIZE + settings.TILE_SIZE // 2, y * settings.TILE_SIZE + settings.TILE_SIZE // 2)
-        pygame.draw.circle(self.screen, (0, 255, 0), center, settings.TILE_SIZE // 4)
+        center = self.camera.to_screen([center])[0].astype(int)
+        pygame.draw.circle(self.screen, (0, 255, 0), center, max(int(settings.TILE_SIZE // 4 * self.camera.zoom), 1))
 
     def visualize_death(self, position):
      
-        x, y = position
-        center = (x * settings.TILE_SIZE + settings.TILE_SIZE // 2, y * settings.TILE_SIZE + settings.TILE_SIZE // 2)
-        for _ in range(30):
-            # Create particles with random speed and direction
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(2, 5)
-            velocity = (speed * math.cos(angle), speed * math.sin(angle))
-            self.death_particles.append({
-                "position": list(center),
-                "velocity": velocity,
-                "lifetime": 255
-            })
+        self.visualize_deaths([position])
+
+    def visualize_deaths(self, positions):
+        """Bursts PARTICLES_PER_DEATH particles from each of the given grid positions."""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        centers = positions * settings.TILE_SIZE + settings.TILE_SIZE // 2
+        count = len(centers) * PARTICLES_PER_DEATH
+
+        # Create particles with random speed and direction
+        generator = rng.stream("visualization")
+        angle = generator.uniform(0, 2 * math.pi, count)
+        speed = generator.uniform(2, 5, count)
+        velocity = np.column_stack((speed * np.cos(angle), speed * np.sin(angle)))
+
+        self.particle_position = np.concatenate([self.particle_position, np.repeat(centers, PARTICLES_PER_DEATH, axis=0)])
+        self.particle_velocity = np.concatenate([self.particle_velocity, velocity])
+        self.particle_lifetime = np.concatenate([self.particle_lifetime, np.full(count, PARTICLE_LIFETIME)])
             
     def _update_and_draw_particles(self):
         
-        particles_to_keep = []
-        for particle in self.death_particles:
-            particle["position"][0] += particle["velocity"][0]
-            particle["position"][1] += particle["velocity"][1]
-            particle["lifetime"] -= 5 # Decrease opacity
-            
-            if particle["lifetime"] > 0:
-                # Clamp the alpha value between 0 and 255
-                alpha = max(0, min(255, int(particle["lifetime"])))
-                color_with_alpha = settings.COLORS["death_particle"] + (alpha,)
-                
-                # Draw the particle as a small circle
-                # We need to create a new surface with per-pixel alpha
-                s = pygame.Surface((5, 5), pygame.SRCALPHA)
-                pygame.draw.circle(s, color_with_alpha, (2, 2), 2)
-                self.screen.blit(s, particle["position"])
-                particles_to_keep.append(particle)
-        self.death_particles = particles_to_keep
+        if not len(self.particle_lifetime):
+            return
+        self.particle_position += self.particle_velocity
+        self.particle_lifetime -= PARTICLE_FADE # Decrease opacity
+
+        alive = self.particle_lifetime > 0
+        self.particle_position = self.particle_position[alive]
+        self.particle_velocity = self.particle_velocity[alive]
+        self.particle_lifetime = self.particle_lifetime[alive]
+
+        # Draw every on-screen particle with the sprite for its alpha (lifetime clamped to 0-255)
+        positions = self.camera.to_screen(self.particle_position)
+        on_screen = ((positions > -5) & (positions < self.screen.get_size())).all(axis=1)
+        sprites = self.particle_sprites
+        alphas = np.minimum(self.particle_lifetime[on_screen], 255).tolist()
+        positions = positions[on_screen].astype(np.int64).tolist()
+        self.screen.blits([(sprites[alpha], position) for alpha, position in zip(alphas, positions)], doreturn=False)
 
     def _draw_grid(self):
         
-        for y in range(self.environment.height):
-            for x in range(self.environment.width):
-                cell = self.environment.grid[y][x]
-                rect = pygame.Rect(x * settings.TILE_SIZE, y * settings.TILE_SIZE, settings.TILE_SIZE, settings.TILE_SIZE)
+        self._update_terrain()
 
-                # Base color for the cell
-                color = settings.COLORS["ground"]
+        # Draw only the visible part of the terrain: one pixel per cell (or per block of
+        # cells when zoomed out below a pixel per cell), scaled up to the tile size on screen
+        camera = self.camera
+        tile = settings.TILE_SIZE
+        block = 1
+        while tile * camera.zoom * block < 1:
+            block *= 2
+        image = self._terrain_level(block)
+
+        x0, y0, x1, y1 = camera.visible_cells(self.environment.width, self.environment.height)
+        bx0, by0 = x0 // block, y0 // block
+        bx1, by1 = -(-x1 // block), -(-y1 // block)
+        if bx0 >= bx1 or by0 >= by1:
+            return
+        cells = pygame.surfarray.make_surface(image[by0:by1, bx0:bx1].transpose(1, 0, 2))
+        (left, top), (right, bottom) = camera.to_screen(np.array([(bx0, by0), (bx1, by1)]) * block * tile)
+        left, top, right, bottom = round(left), round(top), round(right), round(bottom)
+        self.screen.blit(pygame.transform.scale(cells, (right - left, bottom - top)), (left, top))
+
+    def _update_terrain(self):
+        """Recomputes the cached colors of the cells whose resources or hazards changed."""
+        ys, xs = self.environment.pop_dirty_cells()
+        if not len(ys):
+            return
+        # When many cells changed, recompute the whole terrain as one image instead
+        if len(ys) > settings.TERRAIN_FULL_REDRAW_FRACTION * self.environment.width * self.environment.height:
+            self.terrain_image[:] = self._terrain_colors(np.s_[:, :])
+            self.terrain_levels.clear()
+            return
+        self.terrain_image[ys, xs] = self._terrain_colors(ys, xs)
+        for block in list(self.terrain_levels):
+            blocks = np.unique(np.column_stack((ys // block, xs // block)), axis=0)
+            if len(blocks) * block * block > self.terrain_image.shape[0] * self.terrain_image.shape[1]:
+                del self.terrain_levels[block]  # Cheaper to rebuild on next use
+            else:
+                self.terrain_levels[block][blocks[:, 0], blocks[:, 1]] = self._block_means(block, blocks[:, 0], blocks[:, 1])
+
+    def _terrain_level(self, block):
+        """Terrain colors averaged over block x block cells (block 1 is the per-cell image)."""
+        if block == 1:
+            return self.terrain_image
+        if block not in self.terrain_levels:
+            height, width = self.terrain_image.shape[:2]
+            rows, columns = -(-height // block), -(-width // block)
+            padded = np.zeros((rows * block, columns * block, 3))
+            padded[:height, :width] = self.terrain_image
+            counts = np.zeros((rows * block, columns * block))
+            counts[:height, :width] = 1
+            sums = padded.reshape(rows, block, columns, block, 3).sum(axis=(1, 3))
+            cells = counts.reshape(rows, block, columns, block).sum(axis=(1, 3))
+            self.terrain_levels[block] = (sums / cells[..., None]).astype(np.uint8)
+        return self.terrain_levels[block]
+
+    def _block_means(self, block, rows, columns):
+        """Average terrain color of the given blocks, ignoring the cells past the grid edge."""
+        height, width = self.terrain_image.shape[:2]
+        ys = rows[:, None] * block + np.arange(block)
+        xs = columns[:, None] * block + np.arange(block)
+        inside = (ys < height)[:, :, None] & (xs < width)[:, None, :]
+        cells = self.terrain_image[np.minimum(ys, height - 1)[:, :, None], np.minimum(xs, width - 1)[:, None, :]]
+        sums = (cells * inside[..., None]).sum(axis=(1, 2))
+        return (sums / inside.sum(axis=(1, 2))[:, None]).astype(np.uint8)
+
+    def _terrain_colors(self, ys, xs=None):
+        """
+        Colors of the given cells: an (n, 3) array for coordinate arrays ys, xs,
+        or an (..., 3) image when ys is a slice of the grid such as np.s_[:, :].
+        """
+        env = self.environment
+        cells = ys if xs is None else (ys, xs)
+
+        # Base color index for the cell: ground, overridden by the resource if present
+        # (lowest priority first, so plant wins over water over mineral)
+        base = np.zeros(env.hazards[cells].shape, dtype=np.uint8)
+        for code, r_type in enumerate(("mineral", "water", "plant"), start=1):
+            base[env.has_resource[r_type][cells] & (env.quantity[r_type][cells] > 0)] = code
+        palette = np.array([settings.COLORS[name] for name in TERRAIN_PALETTE], dtype=float)
+
+        # Add hazard shading, one color channel at a time
+        hazard_intensity = np.minimum(1, np.maximum(env.hazards[cells], 0) / settings.MAX_HAZARD_VALUE)
+        colors = np.empty(base.shape + (3,), dtype=np.uint8)
+        for channel in range(3):
+            colors[..., channel] = (np.take(palette[:, channel], base) * (1 - hazard_intensity)
+                                    + settings.COLORS["hazard"][channel] * hazard_intensity)
+        return colors
+
+    def _tile_size(self):
+        """On-screen tile size in whole pixels at the current zoom."""
+        return max(int(round(settings.TILE_SIZE * self.camera.zoom)), 1)
+
+    def _sprite_corners(self, positions, tile):
+        """Screen position of the sprites' top-left corners for an (n, 2) array of cells."""
+        corners = self.camera.to_screen(np.asarray(positions) * settings.TILE_SIZE)
+        return (np.round(corners) - self._sprite_margin(tile)).astype(np.int64)
+
+    def _draw_agents(self, agents):
+        """Draws all on-screen agents with their cached sprites in a single blits call."""
+        tile = self._tile_size()
+        buckets = settings.AGENT_ENERGY_BUCKETS
+        sprites = self.agent_sprites
+        x0, y0, x1, y1 = self.camera.visible_cells(self.environment.width, self.environment.height)
+        visible, looks = [], []
+        for agent in agents:
+            x, y = agent.position
+            # One extra cell below and to the sides, whose horns reach into view
+            if not (x0 - 1 <= x <= x1 and y0 <= y <= y1):
+                continue
+            bucket = 0 if buckets <= 1 else min(max(int(agent.energy / constants.MAX_ENERGY * buckets), 0), buckets - 1)
+            key = (self._color_level(agent.color), agent.species_id == "predator", bucket, tile)
+            sprite = sprites.get(key)
+            if sprite is None:
+                sprite = sprites[key] = self._render_agent_sprite(*key)
+            visible.append((x, y))
+            looks.append(sprite)
+        if visible:
+            corners = self._sprite_corners(visible, tile).tolist()
+            self.screen.blits(list(zip(looks, corners)), doreturn=False)
+
+    def _draw_pool(self, pool, rows=None):
+        """
+        Draws the agents in the given pool rows (by default the live agents on screen, found
+        through the pool's spatial lookup) in a single blits call, picking each sprite by
+        color level, predator flag and energy bucket with array operations.
+        """
+        if rows is None:
+            x0, y0, x1, y1 = self.camera.visible_cells(self.environment.width, self.environment.height)
+            # One extra cell below and to the sides, whose horns reach into view;
+            # drawn in row order so overlapping agents stack the same way every frame
+            rows = np.sort(pool.rows_in_rect(x0 - 1, y0, x1 + 1, y1 + 1))
+        tile = self._tile_size()
+        buckets = max(settings.AGENT_ENERGY_BUCKETS, 1)
+        energy_bucket = np.clip((pool.energy[rows] / constants.MAX_ENERGY * buckets).astype(np.int64), 0, buckets - 1)
+        agent_species = pool.species[rows]
+        species_looks = self._species_looks(pool, agent_species)
+        looks, agent_looks = np.unique(species_looks[agent_species] * buckets + energy_bucket, return_inverse=True)
+
+        # Species whose colors round to the same level share their sprites
+        levels, step = SPRITE_COLOR_LEVELS, 256 // SPRITE_COLOR_LEVELS
+        look_sprites = np.empty(len(looks), dtype=object)
+        for index, look in enumerate(looks.tolist()):
+            look, bucket = divmod(look, buckets)
+            color, predator = divmod(look, 2)
+            color = tuple(level * step + step // 2 for level in (color // levels ** 2, color // levels % levels, color % levels))
+            key = (color, bool(predator), bucket, tile)
+            sprite = self.agent_sprites.get(key)
+            if sprite is None:
+                sprite = self.agent_sprites[key] = self._render_agent_sprite(*key)
+            look_sprites[index] = sprite
+
+        corners = self._sprite_corners(pool.position[rows], tile).tolist()
+        self.screen.blits(list(zip(look_sprites[agent_looks].tolist(), corners)), doreturn=False)
 
-                # Override with resource color if present
-                if "plant" in cell['resources'] and cell['resources']['plant'].quantity > 0:
-                    color = settings.COLORS["resource_plant"]
-                elif "water" in cell['resources'] and cell['resources']['water'].quantity > 0:
-                    color = settings.COLORS["resource_water"]
-                elif "mineral" in cell['resources'] and cell['resources']['mineral'].quantity > 0:
-                    color = settings.COLORS["resource_mineral"]
-                
-                # Add hazard shading
-                if cell['hazards'] > 0:
-                    hazard_intensity = min(1, cell['hazards'] / settings.MAX_HAZARD_VALUE)
-                    r = int(color[0] * (1 - hazard_intensity) + settings.COLORS["hazard"][0] * hazard_intensity)
-                    g = int(color[1] * (1 - hazard_intensity) + settings.COLORS["hazard"][1] * hazard_intensity)
-                    b = int(color[2] * (1 - hazard_intensity) + settings.COLORS["hazard"][2] * hazard_intensity)
-                    color = (r, g, b)
-                
-                pygame.draw.rect(self.screen, color, rect)
-                
     def _draw_agent(self, agent):
       
-        x, y = agent.position
-        radius = settings.TILE_SIZE // 2 - 1
-        center = (x * settings.TILE_SIZE + radius, y * settings.TILE_SIZE + radius)
+        self._draw_agents([agent])
+
+    def _species_looks(self, pool, codes):
+        """
+        Look of each species code of `pool`: its color level and predator flag packed
+        into one int, or -1 if not needed yet. Looks are kept across frames (until the
+        pool renumbers its codes), so only species among `codes` never drawn before are
+        looked up.
+        """
+        if self._looks_of != (pool, pool.codes_version):
+            self._looks_of = (pool, pool.codes_version)
+            self.species_looks = np.empty(0, dtype=np.int64)
+        known = len(self.species_looks)
+        if known < pool.species_count:
+            self.species_looks = np.concatenate([self.species_looks,
+                                                 np.full(pool.species_count - known, -1, dtype=np.int64)])
+        missing = np.unique(codes[self.species_looks[codes] < 0])
+        levels, step = SPRITE_COLOR_LEVELS, 256 // SPRITE_COLOR_LEVELS
+        for code, species_id in zip(missing.tolist(), pool.species_ids[missing].tolist()):
+            r, g, b = (c // step for c in species_color(species_id))
+            self.species_looks[code] = ((r * levels + g) * levels + b) * 2 + (species_id == "predator")
+        return self.species_looks
+
+    @staticmethod
+    def _color_level(color):
+        """An agent color rounded to the middle of its SPRITE_COLOR_LEVELS level on each channel."""
+        step = 256 // SPRITE_COLOR_LEVELS
+        return tuple(c // step * step + step // 2 for c in color)
+
+    @staticmethod
+    def _sprite_margin(tile):
+        """Pixels an agent sprite extends past its tile on each side, to fit the horns."""
+        return math.ceil((tile // 2 - 1) * 0.2) + 2 if tile >= 4 else 0
+
+    def _render_agent_sprite(self, color, predator, energy_bucket, tile=settings.TILE_SIZE):
+        """Pre-renders one agent look; with several energy buckets, low-energy agents are drawn darker."""
+        margin = self._sprite_margin(tile)
+        # Agents are drawn without anti-aliasing, so a color key is exact and blits much faster than per-pixel alpha
+        sprite = pygame.Surface((tile + 2 * margin, tile + 2 * margin)).convert()
+        sprite.fill(SPRITE_COLORKEY)
+        sprite.set_colorkey(SPRITE_COLORKEY, pygame.RLEACCEL)
+        shade = (energy_bucket + 1) / max(settings.AGENT_ENERGY_BUCKETS, 1)
+        color = tuple(int(c * shade) for c in color)
+
+        # Tiles too small for a circle are drawn as a filled square
+        if tile < 4:
+            sprite.fill(color)
+            return sprite
+
+        radius = tile // 2 - 1
+        center = (margin + radius, margin + radius)
         
         # Draw the main agent body
-        pygame.draw.circle(self.screen, agent.color, center, radius)
+        pygame.draw.circle(sprite, color, center, radius)
 
         # Draw horns for predators
-        if agent.species_id == "predator":
+        if predator:
             horn_color = settings.COLORS["horns"]
             horn_length = radius * 0.8
             horn_width = 2
@@ -115,17 +409,17 @@ class Visualization:
             # Left horn
             start_pos_l = (center[0] - radius * 0.4, center[1] - radius * 0.4)
             end_pos_l = (start_pos_l[0] - horn_length * 0.5, start_pos_l[1] - horn_length)
-            pygame.draw.line(self.screen, horn_color, start_pos_l, end_pos_l, horn_width)
+            pygame.draw.line(sprite, horn_color, start_pos_l, end_pos_l, horn_width)
 
             # Right horn
             start_pos_r = (center[0] + radius * 0.4, center[1] - radius * 0.4)
             end_pos_r = (start_pos_r[0] + horn_length * 0.5, start_pos_r[1] - horn_length)
-            pygame.draw.line(self.screen, horn_color, start_pos_r, end_pos_r, horn_width)
+            pygame.draw.line(sprite, horn_color, start_pos_r, end_pos_r, horn_width)
+        return sprite
 
     def quit(self):
        
         pygame.quit()
-
 """
 
 # modules/visualization.py
@@ -4,14 +4,13 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.
 
 import pandas as pd
 import random
-import pygame
 from config import settings, constants
 from modules.agent import Agent
 from modules.environment import Environment
 from modules.decision_engine import DecisionEngine
 from modules.evolution import reproduce
-from modules.visualization import Visualization
-from modules.utils import setup_directories, log_agent_data, log_species_data, save_logs
+from modules.utils import (setup_directories, LogWriter, SIMULATION_LOG_SCHEMA, SPECIES_LOG_SCHEMA,
+                           log_agent_data, log_species_data, save_logs)
 import time
 
 def run_disaster_scenario(scenario_name, initial_prey, initial_predators, disaster_step, disaster_type, hazard_increase):
@@ -27,8 +26,8 @@ def run_disaster_scenario(scenario_name, initial_prey, initial_predators, disast
     agents = [Agent(name=f"Prey_{i}", species_id="prey", position=(random.randint(0, settings.GRID_WIDTH-1), random.randint(0, settings.GRID_HEIGHT-1))) for i in range(initial_prey)]
     agents.extend([Agent(name=f"Predator_{i}", species_id="predator", position=(random.randint(0, settings.GRID_WIDTH-1), random.randint(0, settings.GRID_HEIGHT-1))) for i in range(initial_predators)])
     
-    agent_logs = []
-    species_logs = []
+    agent_logs = LogWriter(f"{constants.LOG_DIR}{scenario_name}_simulation_logs.csv", SIMULATION_LOG_SCHEMA)
+    species_logs = LogWriter(f"{constants.LOG_DIR}{scenario_name}_species_logs.csv", SPECIES_LOG_SCHEMA)
 
     for step in range(settings.MAX_STEPS):
         # Trigger disaster
@@ -54,8 +53,7 @@ def run_disaster_scenario(scenario_name, initial_prey, initial_predators, disast
             agent.check_status()
             
             # Log agent data
-            agent_log_entry = log_agent_data(agent, step, action, 0)
-            agent_logs.append(agent_log_entry)
+            log_agent_data(agent_logs, agent, step, action, 0)
 
         agents = [agent for agent in agents if agent.alive]
         agents.extend(new_agents)
@@ -64,8 +62,7 @@ def run_disaster_scenario(scenario_name, initial_prey, initial_predators, disast
         for agent in agents:
             species_populations[agent.species_id] += 1
         for species_id, size in species_populations.items():
-            species_log_entry = log_species_data(species_id, step, size)
-            species_logs.append(species_log_entry)
+            log_species_data(species_logs, species_id, step, size)
             
         print(f"Step: {step}, Population: {len(agents)}, Prey: {species_populations['prey']}, Predator: {species_populations['predator']}")
 
@@ -73,11 +70,8 @@ def run_disaster_scenario(scenario_name, initial_prey, initial_predators, disast
             print("All agents have perished.")
             break
             
-    simulation_log_df = pd.DataFrame(agent_logs)
-    species_log_df = pd.DataFrame(species_logs)
-
-    save_logs(simulation_log_df, f"{constants.LOG_DIR}{scenario_name}_simulation_logs.csv")
-    save_logs(species_log_df, f"{constants.LOG_DIR}{scenario_name}_species_logs.csv")
+    save_logs(agent_logs, agent_logs.filepath)
+    save_logs(species_logs, species_logs.filepath)
     print(f"Scenario {scenario_name} finished. Logs saved.")
 
 
@@ -2,15 +2,14 @@ import sys
 import os
 import pandas as pd
 import random
-import pygame
 import uuid
 from config import settings, constants
 from modules.agent import Agent
 from modules.environment import Environment
 from modules.decision_engine import DecisionEngine
 from modules.evolution import reproduce
-from modules.visualization import Visualization
-from modules.utils import setup_directories, log_agent_data, log_species_data, save_logs
+from modules.utils import (setup_directories, LogWriter, SIMULATION_LOG_SCHEMA, SPECIES_LOG_SCHEMA,
+                           log_agent_data, log_species_data, save_logs)
 import time
 
 def run_multi_species_scenario(scenario_name, initial_species_populations):
@@ -30,8 +29,8 @@ def run_multi_species_scenario(scenario_name, initial_species_populations):
         elif species_id == "predator":
             agents.extend([Agent(name=f"Predator_{i}", species_id="predator", position=(random.randint(0, settings.GRID_WIDTH-1), random.randint(0, settings.GRID_HEIGHT-1))) for i in range(count)])
     
-    agent_logs = []
-    species_logs = []
+    agent_logs = LogWriter(f"{constants.LOG_DIR}{scenario_name}_simulation_logs.csv", SIMULATION_LOG_SCHEMA)
+    species_logs = LogWriter(f"{constants.LOG_DIR}{scenario_name}_species_logs.csv", SPECIES_LOG_SCHEMA)
 
     for step in range(settings.MAX_STEPS):
         new_agents = []
@@ -49,8 +48,7 @@ def run_multi_species_scenario(scenario_name, initial_species_populations):
                 agent.energy -= settings.REPRODUCTION_ENERGY_THRESHOLD
                 
             # Log agent data
-            agent_log_entry = log_agent_data(agent, step, action, 0)
-            agent_logs.append(agent_log_entry)
+            log_agent_data(agent_logs, agent, step, action, 0)
         
         agents = [agent for agent in agents if agent.alive]
         agents.extend(new_agents)
@@ -59,8 +57,7 @@ def run_multi_species_scenario(scenario_name, initial_species_populations):
         for agent in agents:
             species_populations[agent.species_id] += 1
         for species_id, size in species_populations.items():
-            species_log_entry = log_species_data(species_id, step, size)
-            species_logs.append(species_log_entry)
+            log_species_data(species_logs, species_id, step, size)
             
         print(f"Step: {step}, Population: {len(agents)}, Species populations: {species_populations}")
 
@@ -68,11 +65,8 @@ def run_multi_species_scenario(scenario_name, initial_species_populations):
             print("All agents have perished.")
             break
 
-    simulation_log_df = pd.DataFrame(agent_logs)
-    species_log_df = pd.DataFrame(species_logs)
-    
-    save_logs(simulation_log_df, f"{constants.LOG_DIR}{scenario_name}_simulation_logs.csv")
-    save_logs(species_log_df, f"{constants.LOG_DIR}{scenario_name}_species_logs.csv")
+    save_logs(agent_logs, agent_logs.filepath)
+    save_logs(species_logs, species_logs.filepath)
     print(f"Scenario {scenario_name} finished. Logs saved.")
 
 
@@ -2,12 +2,12 @@ import sys
 import os
 import pandas as pd
 import random
-import pygame
 from config import settings, constants
 from modules.agent import Agent
 from modules.environment import Environment
 from modules.decision_engine import DecisionEngine
-from modules.utils import setup_directories, log_agent_data, log_species_data, save_logs
+from modules.utils import (setup_directories, LogWriter, SIMULATION_LOG_SCHEMA, REWARDS_LOG_SCHEMA,
+                           log_agent_data, save_logs)
 import time
 
 def train_agent_in_scenario(scenario_name, num_episodes):
@@ -24,8 +24,8 @@ def train_agent_in_scenario(scenario_name, num_episodes):
     rl_engine = DecisionEngine()
     agent = Agent(name="RL_Agent", species_id="training_species")
     
-    simulation_log_df = pd.DataFrame(columns=['step', 'agent_id', 'agent_name', 'species_id', 'health', 'energy', 'position_x', 'position_y', 'generation', 'age', 'speed', 'intelligence', 'aggression', 'cooperation', 'pollution_tolerance', 'action', 'reward'])
-    rewards_log = []
+    simulation_log = LogWriter(f"{constants.LOG_DIR}{scenario_name}_simulation_logs.csv", SIMULATION_LOG_SCHEMA)
+    rewards_log = LogWriter(f"{constants.LOG_DIR}{scenario_name}_rewards_logs.csv", REWARDS_LOG_SCHEMA)
 
     for episode in range(num_episodes):
         agent.reset()
@@ -56,7 +56,7 @@ def train_agent_in_scenario(scenario_name, num_episodes):
             rl_engine.update_q_table(current_state, action, reward, next_state)
 
             # Log data
-            simulation_log_df = log_agent_data(simulation_log_df, agent, step, action, reward)
+            log_agent_data(simulation_log, agent, step, action, reward)
         
         rewards_log.append({'episode': episode, 'total_reward': total_reward, 'exploration_rate': rl_engine.exploration_rate})
         
@@ -66,9 +66,8 @@ def train_agent_in_scenario(scenario_name, num_episodes):
         print(f"Episode: {episode+1}/{num_episodes}, Total Reward: {total_reward}, Exploration Rate: {rl_engine.exploration_rate:.2f}")
 
     # Save logs and the trained Q-table
-    save_logs(simulation_log_df, f"{constants.LOG_DIR}{scenario_name}_simulation_logs.csv")
-    rewards_df = pd.DataFrame(rewards_log)
-    save_logs(rewards_df, f"{constants.LOG_DIR}{scenario_name}_rewards_logs.csv")
+    save_logs(simulation_log, simulation_log.filepath)
+    save_logs(rewards_log, rewards_log.filepath)
     rl_engine.save_q_table()
     print(f"Scenario {scenario_name} finished. Logs and Q-table saved.")
 